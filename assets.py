@@ -0,0 +1,70 @@
+import time
+
+import pygame
+
+# Colors of the gradient behind the menu and game-over screens
+BG_COLOR = (18, 18, 18)
+PRIMARY = (86, 63, 251)
+
+
+class Assets:
+    """Images, fonts and gradients built once per game and shared by its screens."""
+
+    def __init__(self):
+        self.fonts = {}
+        self.gradients = {}
+        self.images = {}
+        self.load_time = 0.0  # Seconds spent loading and preparing images
+
+    def image(self, path, size=None, flip=(False, False)):
+        # The image at path, scaled to size and flipped (x, y) as asked
+        key = (path, size, flip)
+        image = self.images.get(key)
+        if image is not None:
+            return image
+        # Flipped variants are made from the (scaled) image, itself cached
+        if flip != (False, False):
+            source = self.image(path, size)
+        start = time.perf_counter()
+        if flip != (False, False):
+            image = pygame.transform.flip(source, *flip)
+        else:
+            # Scale before converting; full-size images are only kept when asked for
+            image = self.images.get((path, None, flip)) or pygame.image.load(path)
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
+        self.load_time += time.perf_counter() - start
+        self.images[key] = image
+        return image
+
+    def preload(self, images):
+        # Load and prepare (path, size, flip) images up front; returns the
+        # seconds this took
+        start = self.load_time
+        for spec in images:
+            self.image(*spec)
+        return self.load_time - start
+
+    def font(self, size, name=None):
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = self.fonts[(name, size)] = pygame.font.Font(name, size)
+        return font
+
+    def gradient(self, size, top=BG_COLOR, bottom=PRIMARY, strength=0.15):
+        # Vertical gradient from top towards bottom, mixed in by strength
+        key = (size, top, bottom, strength)
+        surface = self.gradients.get(key)
+        if surface is None:
+            width, height = size
+            surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            for y in range(height):
+                alpha = y / height
+                color = [int(top[i] + (bottom[i] - top[i]) * alpha * strength) for i in range(3)]
+                pygame.draw.line(surface, tuple(color), (0, y), (width, y))
+            self.gradients[key] = surface
+        return surface
@@ -0,0 +1,264 @@
+import numpy as np
+
+from bullets import BULLET_TYPES, POWER, PRECISION
+from engine import (WIDTH, HEIGHT, BALL_RADIUS, FRICTION, BULLET_RADIUS, MAX_POWER,
+                    BULLET_SPEED, POWER_INCREMENT, FPS, MatchEngine)
+
+# Action type code for no shot; bullets use the codes from bullets.py
+NO_SHOT = 0
+
+# Bullet slots per match; with the 0.6 s turn delay a side never has more
+# than two bullets in the air, so this leaves plenty of headroom
+MAX_BULLETS = 8
+
+
+def _splitmix64(x):
+    with np.errstate(over="ignore"):
+        z = x + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class BatchEngine:
+    """N independent matches stored as arrays and advanced one tick at a time in lockstep.
+
+    Decisions are passed to step() as (N, 3) arrays of [angle, power, type code]
+    per side and only take effect for matches where that side is ready to shoot.
+    """
+
+    def __init__(self, n, seeds=None, max_bullets=MAX_BULLETS):
+        self.n = n
+        self.max_bullets = max_bullets
+
+        # Rules, taken from a reference MatchEngine so both stay in sync
+        rules = MatchEngine(None, None)
+        self.game_time = rules.game_time
+        self.positions = np.array(rules.positions, dtype=np.float64)
+        self.cannon_pos = np.array([rules.cannon1_pos, rules.cannon2_pos], dtype=np.float64)
+        self.powerbulletscount = rules.powerbulletscount
+        self.precisionbulletscount = rules.precisionbulletscount
+        self.powerbullet_angle_error = rules.powerbullet_angle_error
+        self.powerbullet_multiplier = rules.powerbullet_multiplier
+        self.winning_score = rules.winning_score
+        self.turn_delay_ticks = rules.turn_delay_ticks
+
+        # Per-match random streams (counter-based, so every match is independent)
+        if seeds is None:
+            seeds = np.random.SeedSequence().generate_state(n, dtype=np.uint64)
+        self.seeds = np.asarray(seeds, dtype=np.uint64).reshape(n)
+        self.draws = np.zeros(n, dtype=np.uint64)
+
+        # Clock
+        self.ticks = 0
+        self.counter = np.full(n, self.game_time, dtype=np.int64)
+        self.end_tick = np.full(n, -1, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        # Ball
+        self.ball_pos = np.tile(np.array([WIDTH // 2, HEIGHT // 2], dtype=np.float64), (n, 1))
+        self.ball_vel = np.zeros((n, 2), dtype=np.float64)
+        self.round_counter = np.zeros(n, dtype=np.int64)
+
+        # Bullets in flight
+        self.bullet_active = np.zeros((n, max_bullets), dtype=bool)
+        self.bullet_pos = np.zeros((n, max_bullets, 2), dtype=np.float64)
+        self.bullet_vel = np.zeros((n, max_bullets, 2), dtype=np.float64)
+        self.bullet_angle = np.zeros((n, max_bullets), dtype=np.float64)
+        self.bullet_power = np.zeros((n, max_bullets), dtype=np.float64)
+        self.bullet_type = np.zeros((n, max_bullets), dtype=np.int8)
+
+        # Per side state, column 0 is the left player and column 1 the right
+        self.angle = np.tile(np.array([0.0, 180.0]), (n, 1))
+        self.cannon_power = np.zeros((n, 2), dtype=np.float64)
+        self.power_bullets = np.full((n, 2), self.powerbulletscount, dtype=np.int64)
+        self.precision_bullets = np.full((n, 2), self.precisionbulletscount, dtype=np.int64)
+        self.bullets_used = np.zeros((n, 2), dtype=np.int64)
+        self.scores = np.zeros((n, 2), dtype=np.int64)
+        self.last_shot_tick = np.full((n, 2), -self.turn_delay_ticks, dtype=np.int64)
+        self.executing = np.zeros((n, 2), dtype=bool)
+        self.exec_angle = np.zeros((n, 2), dtype=np.float64)
+        self.exec_power = np.zeros((n, 2), dtype=np.float64)
+        self.exec_type = np.zeros((n, 2), dtype=np.int8)
+
+    def uniform(self, rows, low, high):
+        # One draw from the stream of each match in rows
+        counter = self.draws[rows]
+        self.draws[rows] += np.uint64(1)
+        bits = _splitmix64(self.seeds[rows] ^ _splitmix64(counter))
+        return low + (high - low) * (bits >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+    def ready(self, side):
+        # Matches where the given side (0 or 1) will act on its decision this tick
+        return (~self.game_over & ~self.executing[:, side] &
+                (self.ticks - self.last_shot_tick[:, side] >= self.turn_delay_ticks))
+
+    def reset_ball(self, mask):
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return
+        self.round_counter[rows] += 1
+        jitter_x = np.floor(self.uniform(rows, 0, 11)) - 5
+        jitter_y = np.floor(self.uniform(rows, 0, 11)) - 5
+        self.ball_pos[rows] = self.positions[self.round_counter[rows] % 5] + np.stack([jitter_x, jitter_y], axis=1)
+        self.ball_vel[mask] = 0
+        self.power_bullets[mask] = self.powerbulletscount
+        self.precision_bullets[mask] = self.precisionbulletscount
+        self.bullet_active[mask] = False
+        self.executing[mask] = False
+        self.cannon_power[mask] = 0
+
+    def handle_player_turns(self, live, actions):
+        for side in (0, 1):
+            # Charge or fire the shot being executed
+            executing = live & self.executing[:, side]
+            charging = executing & (self.cannon_power[:, side] < self.exec_power[:, side]) & \
+                (self.cannon_power[:, side] < MAX_POWER)
+            self.cannon_power[charging, side] += 1
+            self.fire(side, executing & ~charging)
+
+            # Take new decisions from matches where the side is ready
+            ready = live & ~executing & (self.ticks - self.last_shot_tick[:, side] >= self.turn_delay_ticks)
+            if actions[side] is None or not ready.any():
+                continue
+            action = np.asarray(actions[side], dtype=np.float64)
+            kind = action[:, 2].astype(np.int8)
+            shooting = ready & (kind != NO_SHOT)
+            self.angle[shooting, side] = action[shooting, 0]
+            accept_power = shooting & (kind == POWER) & (self.power_bullets[:, side] > 0)
+            accept_precision = shooting & (kind == PRECISION) & (self.precision_bullets[:, side] > 0)
+            self.power_bullets[accept_power, side] -= 1
+            self.precision_bullets[accept_precision, side] -= 1
+            accepted = accept_power | accept_precision
+            self.bullets_used[accepted, side] += 1
+            self.executing[accepted, side] = True
+            self.exec_angle[accepted, side] = action[accepted, 0]
+            self.exec_power[accepted, side] = action[accepted, 1]
+            self.exec_type[accepted, side] = kind[accepted]
+
+    def fire(self, side, mask):
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return
+        angle = self.exec_angle[rows, side]
+        power_shot = self.exec_type[rows, side] == POWER
+        if side == 0 and power_shot.any():
+            # Only the left cannon has an angle error on power bullets
+            angle[power_shot] += self.uniform(rows[power_shot], -self.powerbullet_angle_error,
+                                              self.powerbullet_angle_error)
+        free = ~self.bullet_active[rows]
+        if not free.any(axis=1).all():
+            raise RuntimeError("Bullet capacity exceeded; raise max_bullets")
+        slots = free.argmax(axis=1)
+        radians = np.radians(angle)
+        self.bullet_active[rows, slots] = True
+        self.bullet_pos[rows, slots] = self.cannon_pos[side]
+        self.bullet_vel[rows, slots, 0] = np.cos(radians) * BULLET_SPEED
+        self.bullet_vel[rows, slots, 1] = -np.sin(radians) * BULLET_SPEED
+        self.bullet_angle[rows, slots] = angle
+        self.bullet_power[rows, slots] = self.cannon_power[rows, side]
+        self.bullet_type[rows, slots] = self.exec_type[rows, side]
+        self.last_shot_tick[rows, side] = self.ticks
+        self.cannon_power[rows, side] = 0
+        self.executing[rows, side] = False
+
+    def check_rules(self, live):
+        if self.ticks > 0 and self.ticks % FPS == 0:
+            self.counter[live] -= 1
+            self.game_over |= live & (self.counter <= 0)
+        self.game_over |= live & (self.scores >= self.winning_score).any(axis=1)
+
+        # Ball at rest with both players out of bullets scores for the far side
+        out = (live & (self.ball_vel == 0).all(axis=1) &
+               (self.power_bullets == 0).all(axis=1) & (self.precision_bullets == 0).all(axis=1))
+        if out.any():
+            x = self.ball_pos[:, 0]
+            left_scores = np.abs(x - self.cannon_pos[0, 0]) > np.abs(x - self.cannon_pos[1, 0])
+            self.scores[out & left_scores, 0] += 1
+            self.scores[out & ~left_scores, 1] += 1
+            self.reset_ball(out)
+
+    def update_ball(self, live):
+        pos, vel = self.ball_pos, self.ball_vel
+        moving = live[:, None]
+        pos += vel * moving
+        vel *= np.where(moving, FRICTION, 1.0)
+        vel[moving & (np.abs(vel) < 0.1)] = 0
+
+        bounce = live & ((pos[:, 1] - BALL_RADIUS <= 0) | (pos[:, 1] + BALL_RADIUS >= HEIGHT))
+        vel[bounce, 1] = -vel[bounce, 1]
+        left_goal = live & (pos[:, 0] - BALL_RADIUS <= 0)
+        right_goal = live & ~left_goal & (pos[:, 0] + BALL_RADIUS >= WIDTH)
+        self.scores[left_goal, 1] += 1
+        self.scores[right_goal, 0] += 1
+        self.reset_ball(left_goal | right_goal)
+
+    def handle_bullets(self, live):
+        # Work on the flat list of bullets in flight rather than every slot
+        rows, slots = np.nonzero(self.bullet_active & live[:, None])
+        if not len(rows):
+            return
+        pos = self.bullet_pos[rows, slots] + self.bullet_vel[rows, slots]
+        self.bullet_pos[rows, slots] = pos
+        inside = (pos[:, 0] >= 0) & (pos[:, 0] <= WIDTH) & (pos[:, 1] >= 0) & (pos[:, 1] <= HEIGHT)
+
+        # Bullet-ball collisions
+        dx = self.ball_pos[rows, 0] - pos[:, 0]
+        dy = self.ball_pos[rows, 1] - pos[:, 1]
+        hit = inside & (np.hypot(dx, dy) <= BALL_RADIUS + BULLET_RADIUS)
+        self.bullet_active[rows[~inside | hit], slots[~inside | hit]] = False
+        if not hit.any():
+            return
+        rows, slots = rows[hit], slots[hit]
+        angle = np.arctan2(dy[hit], dx[hit])
+        multiplier = np.where(self.bullet_type[rows, slots] == POWER, self.powerbullet_multiplier, 1.0)
+        impulse = self.bullet_power[rows, slots] * POWER_INCREMENT * multiplier
+        np.add.at(self.ball_vel[:, 0], rows, np.cos(angle) * impulse)
+        np.add.at(self.ball_vel[:, 1], rows, np.sin(angle) * impulse)
+
+    def step(self, actions_left=None, actions_right=None):
+        # One lockstep tick for every match still in play
+        live = ~self.game_over
+        self.handle_player_turns(live, (actions_left, actions_right))
+        self.check_rules(live)
+        self.update_ball(live)
+        self.handle_bullets(live)
+        self.end_tick[live & self.game_over] = self.ticks + 1
+        self.ticks += 1
+        return live.any()
+
+    def winner(self):
+        # Same tie-break as MatchEngine.winner(): goals, then fewer bullets used
+        goals = np.sign(self.scores[:, 0] - self.scores[:, 1])
+        bullets = np.sign(self.bullets_used[:, 1] - self.bullets_used[:, 0])
+        decided = np.where(goals != 0, goals, bullets)
+        return np.select([decided > 0, decided < 0], [1, 2], 0)
+
+    def script_actions(self, script, side):
+        # Call a regular player_script for every ready match
+        actions = np.zeros((self.n, 3), dtype=np.float64)
+        cannon_pos = tuple(int(v) for v in self.cannon_pos[side])
+        for i in np.flatnonzero(self.ready(side)):
+            command = script(cannon_pos, self.ball_pos[i].tolist(),
+                             int(self.power_bullets[i, side]), int(self.precision_bullets[i, side]),
+                             self.ball_vel[i].tolist())
+            if command is not None:
+                angle, power, bullet_type = command
+                actions[i] = angle, power, BULLET_TYPES.get(bullet_type, NO_SHOT)
+        return actions
+
+    def play(self, player_script_left, player_script_right):
+        while not self.game_over.all():
+            self.step(self.script_actions(player_script_left, 0),
+                      self.script_actions(player_script_right, 1))
+        return self.results()
+
+    def results(self):
+        return {
+            "player1_score": self.scores[:, 0].copy(),
+            "player2_score": self.scores[:, 1].copy(),
+            "bullets_used1": self.bullets_used[:, 0].copy(),
+            "bullets_used2": self.bullets_used[:, 1].copy(),
+            "winner": self.winner(),
+            "ticks": self.end_tick.copy(),
+        }
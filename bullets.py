@@ -0,0 +1,176 @@
+import math
+from array import array
+
+# Bullet type codes
+POWER = 1
+PRECISION = 2
+BULLET_TYPES = {"power": POWER, "precision": PRECISION}
+
+# Starting slots; each side has at most two bullets in the air, the pool grows if needed
+POOL_CAPACITY = 8
+
+
+def sweep_circle(x, y, vx, vy, cx, cy, radius):
+    # Times t at which the point (x, y) + t * (vx, vy) is within radius of
+    # (cx, cy), as an (enter, leave) interval, or None if it never is
+    dx = x - cx
+    dy = y - cy
+    a = vx * vx + vy * vy
+    b = dx * vx + dy * vy
+    c = dx * dx + dy * dy - radius * radius
+    if a == 0:
+        return (-math.inf, math.inf) if c <= 0 else None
+    discriminant = b * b - a * c
+    if discriminant < 0:
+        return None
+    root = math.sqrt(discriminant)
+    return (-b - root) / a, (-b + root) / a
+
+
+def leave_time(x, vx, low, high):
+    # Time at which x + t * vx first passes outside [low, high]
+    if vx > 0:
+        return (high - x) / vx
+    if vx < 0:
+        return (low - x) / vx
+    return math.inf
+
+
+class BulletPool:
+    """Bullets in flight as parallel arrays with a precomputed velocity per bullet.
+
+    A bullet's position is always origin + age * velocity, whether it was
+    stepped one tick at a time or advanced many ticks at once, so both give
+    bit-identical positions. Removal swaps the last bullet into the freed
+    slot, so it is O(1) but does not keep firing order.
+    """
+
+    __slots__ = ("count", "ox", "oy", "vx", "vy", "age", "x", "y", "angle", "power", "kind")
+
+    def __init__(self, capacity=POOL_CAPACITY):
+        self.count = 0
+        self.ox = array("d", bytes(8 * capacity))
+        self.oy = array("d", bytes(8 * capacity))
+        self.vx = array("d", bytes(8 * capacity))
+        self.vy = array("d", bytes(8 * capacity))
+        self.age = array("q", bytes(8 * capacity))
+        self.x = array("d", bytes(8 * capacity))
+        self.y = array("d", bytes(8 * capacity))
+        self.angle = array("d", bytes(8 * capacity))
+        self.power = array("d", bytes(8 * capacity))
+        self.kind = array("b", bytes(capacity))
+
+    def __len__(self):
+        return self.count
+
+    def columns(self):
+        return (self.ox, self.oy, self.vx, self.vy, self.age, self.x, self.y,
+                self.angle, self.power, self.kind)
+
+    def grow(self):
+        for column in self.columns():
+            column.extend(column)
+
+    def add(self, x, y, angle, power, kind, speed):
+        i = self.count
+        if i == len(self.kind):
+            self.grow()
+        self.ox[i] = self.x[i] = x
+        self.oy[i] = self.y[i] = y
+        self.vx[i] = math.cos(math.radians(angle)) * speed
+        self.vy[i] = -math.sin(math.radians(angle)) * speed
+        self.age[i] = 0
+        self.angle[i] = angle
+        self.power[i] = power
+        self.kind[i] = kind
+        self.count = i + 1
+
+    def remove(self, i):
+        last = self.count - 1
+        if i != last:
+            for column in self.columns():
+                column[i] = column[last]
+        self.count = last
+
+    def clear(self):
+        self.count = 0
+
+    def advance(self, steps):
+        # Move every bullet steps ticks along its line; the caller makes sure
+        # none of them leaves the field or hits anything on the way
+        for i in range(self.count):
+            age = self.age[i] = self.age[i] + steps
+            self.x[i] = self.ox[i] + age * self.vx[i]
+            self.y[i] = self.oy[i] + age * self.vy[i]
+
+    def event_at(self, i, steps, ball_x, ball_y, reach_squared, width, height):
+        # Whether bullet i is out of the field or touching the ball after
+        # steps more ticks, with exactly the arithmetic of a tick
+        age = self.age[i] + steps
+        bullet_x = self.ox[i] + age * self.vx[i]
+        bullet_y = self.oy[i] + age * self.vy[i]
+        if bullet_x < 0 or bullet_x > width or bullet_y < 0 or bullet_y > height:
+            return True
+        dx = ball_x - bullet_x
+        dy = ball_y - bullet_y
+        return dx * dx + dy * dy <= reach_squared
+
+    def next_event(self, ball_x, ball_y, reach, width, height, limit):
+        # Fewest ticks (1 to limit) after which some bullet leaves the field
+        # or reaches a ball resting at (ball_x, ball_y); None if none does.
+        # The swept contact time only picks where to look; the tick before it
+        # is checked too, so float rounding cannot skip past an event.
+        first = None
+        reach_squared = reach * reach
+        for i in range(self.count):
+            ox, oy, vx, vy, age = self.ox[i], self.oy[i], self.vx[i], self.vy[i], self.age[i]
+            # Continuous times are in bullet ages, ticks start at the next one
+            t = min(leave_time(ox, vx, 0, width), leave_time(oy, vy, 0, height))
+            contact = sweep_circle(ox, oy, vx, vy, ball_x, ball_y, reach)
+            if contact is not None and contact[1] >= age:
+                t = min(t, contact[0])
+            if t == math.inf:
+                continue
+            steps = max(1, math.ceil(t) - age - 1)
+            while steps <= limit and not self.event_at(i, steps, ball_x, ball_y, reach_squared, width, height):
+                steps += 1
+            if steps <= limit:
+                first = limit = steps
+        return first
+
+    def snapshot(self):
+        return [(self.ox[i], self.oy[i], self.vx[i], self.vy[i], self.age[i],
+                 self.angle[i], self.power[i], self.kind[i])
+                for i in range(self.count)]
+
+    def restore(self, bullets):
+        self.count = 0
+        for bullet in bullets:
+            i = self.count
+            if i == len(self.kind):
+                self.grow()
+            (self.ox[i], self.oy[i], self.vx[i], self.vy[i], self.age[i],
+             self.angle[i], self.power[i], self.kind[i]) = bullet
+            self.x[i] = self.ox[i] + self.age[i] * self.vx[i]
+            self.y[i] = self.oy[i] + self.age[i] * self.vy[i]
+            self.count = i + 1
+
+    def copy_columns(self):
+        # Used part of every column, copied; cheaper than snapshot() for
+        # engines that are restored from it over and over
+        count = self.count
+        return tuple(column[:count] for column in self.columns())
+
+    def restore_columns(self, columns):
+        # A slice assignment longer than a column grows it to fit
+        count = len(columns[-1])
+        for column, saved in zip(self.columns(), columns):
+            column[:count] = saved
+        self.count = count
+
+    def copy(self):
+        pool = BulletPool.__new__(BulletPool)
+        pool.count = self.count
+        (pool.ox, pool.oy, pool.vx, pool.vy, pool.age, pool.x, pool.y,
+         pool.angle, pool.power, pool.kind) = (column[:] for column in self.columns())
+        return pool
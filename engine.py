@@ -0,0 +1,669 @@
+import copy
+import math
+import operator
+import random
+import threading
+import time
+
+from bullets import BULLET_TYPES, POWER, BulletPool
+from kinematics import friction_tables, stop_age
+
+# Field settings
+WIDTH = 800
+HEIGHT = 600
+
+# Ball settings
+BALL_RADIUS = 20
+FRICTION = 0.995
+
+# Cannon settings
+CANNON_RADIUS = 30
+BULLET_RADIUS = 5
+MAX_POWER = 30
+BULLET_SPEED = 15
+POWER_INCREMENT = 0.13
+
+# Simulation ticks per game second
+FPS = 60
+
+# Module-level functions of random that draw from its shared global instance
+RANDOM_FUNCTIONS = [name for name in dir(random)
+                    if getattr(getattr(random, name), "__self__", None) is random._inst]
+
+# Held while team code runs, so module code a registry thread executes never
+# sees random's functions pointed at a player's stream, see call_with_random()
+RANDOM_LOCK = threading.RLock()
+
+# Plain attributes that make up the match state, see MatchEngine.get_state()
+STATE_FIELDS = ("ticks", "counter", "round_counter", "game_over",
+                "player1_score", "player2_score", "bullets_used1", "bullets_used2",
+                "powerbullets1", "powerbullets2", "precisionbullets1", "precisionbullets2",
+                "cannon1_power", "cannon2_power", "angle1", "angle2",
+                "player1_ready", "player2_ready", "last_shot_tick1", "last_shot_tick2",
+                "player1_executing", "player2_executing", "ball_age")
+
+# Two-component ball lists of the match state, stored after STATE_FIELDS in an EngineState
+BALL_FIELDS = ("ball_pos", "ball_vel", "ball_origin", "ball_launch", "ball_stop")
+_state_values = operator.attrgetter(*STATE_FIELDS)
+
+
+class RandomStream(random.Random):
+    """Random that keeps its getstate() tuple until the next draw.
+
+    Every draw goes through random(), getrandbits() or gauss(), so the
+    state only has to be read again after one of those; until then
+    getstate() returns the same tuple and setstate() of that tuple does
+    nothing. Snapshots of streams nobody drew from are then nearly free.
+    """
+
+    state = None
+
+    def seed(self, *args, **kwargs):
+        super().seed(*args, **kwargs)
+        self.state = None
+
+    def getstate(self):
+        if self.state is None:
+            self.state = super().getstate()
+        return self.state
+
+    def setstate(self, state):
+        if state is not self.state:
+            super().setstate(state)
+            self.state = state
+
+    def random(self):
+        self.state = None
+        return super().random()
+
+    def getrandbits(self, k):
+        self.state = None
+        return super().getrandbits(k)
+
+    def gauss(self, *args, **kwargs):
+        self.state = None
+        return super().gauss(*args, **kwargs)
+
+
+class EngineState:
+    """Fixed-layout snapshot of a match, see MatchEngine.snapshot().
+
+    values is a flat tuple of STATE_FIELDS followed by both components of
+    each of BALL_FIELDS, bullets a copy of the used part of every
+    BulletPool column and rng and script_rngs the states of the random
+    streams (script_rngs may be None). seed is the match seed and
+    decision_count the length of the engine's decisions at the time;
+    restoring truncates the decisions to it, so it is meant for the engine
+    the snapshot came from or a fork of it. All of it is immutable or
+    copied, so one snapshot can be restored any number of times.
+    """
+
+    __slots__ = ("values", "bullets", "rng", "script_rngs", "seed", "decision_count")
+
+    def __init__(self, values, bullets, rng, script_rngs=None, seed=None, decision_count=0):
+        self.values = values
+        self.bullets = bullets
+        self.rng = rng
+        self.script_rngs = script_rngs
+        self.seed = seed
+        self.decision_count = decision_count
+
+    @property
+    def ticks(self):
+        return self.values[0]
+
+
+class MatchEngine:
+    """Display-free match state and rules shared by the GUI and headless runs."""
+
+    def __init__(self, player_script_left, player_script_right, seed=None):
+        self.init_engine(player_script_left, player_script_right, seed)
+
+    def init_engine(self, player_script_left, player_script_right, seed=None):
+        self.seed_streams(random.randrange(2 ** 63) if seed is None else seed)
+
+        # Field settings
+        self.WIDTH = WIDTH
+        self.HEIGHT = HEIGHT
+
+        # Clock settings
+        self.game_time = 60
+        self.FPS = FPS
+        self.counter = self.game_time
+        self.ticks = 0  # Simulation clock, advanced once per step()
+
+        # Ball settings
+        self.BALL_RADIUS = BALL_RADIUS
+        self.positions = [(self.WIDTH // 2, self.HEIGHT // 2),
+                         (self.WIDTH // 2, self.HEIGHT // 2 + 50),
+                         (self.WIDTH // 2, self.HEIGHT // 2 - 50),
+                         (self.WIDTH // 2, self.HEIGHT // 2 + 100),
+                         (self.WIDTH // 2 - 50, self.HEIGHT // 2 - 100)]
+        self.ball_pos = [self.WIDTH // 2, self.HEIGHT // 2]
+        self.ball_vel = [0, 0]
+        self.FRICTION = FRICTION
+        self.friction_powers, self.friction_sums = friction_tables(self.FRICTION)
+        self.launch_ball([0, 0])
+
+        # Cannon settings
+        self.cannon1_pos = (50, self.HEIGHT // 2)
+        self.cannon2_pos = (self.WIDTH - 50, self.HEIGHT // 2)
+        self.CANNON_RADIUS = CANNON_RADIUS
+        self.BULLET_RADIUS = BULLET_RADIUS
+        self.MAX_POWER = MAX_POWER
+        self.BULLET_SPEED = BULLET_SPEED
+        self.power_increment = POWER_INCREMENT
+
+        # Game state
+        self.cannon1_angle = 45
+        self.cannon2_angle = 45
+        self.cannon1_power = 0
+        self.cannon2_power = 0
+        self.bullets = BulletPool()
+        self.angle1 = 0
+        self.angle2 = 180
+
+        # Bullet counts
+        self.powerbulletscount = 5
+        self.precisionbulletscount = 10
+        self.powerbullets1 = self.powerbulletscount
+        self.powerbullets2 = self.powerbulletscount
+        self.precisionbullets1 = self.precisionbulletscount
+        self.precisionbullets2 = self.precisionbulletscount
+        self.bullets_used1 = 0
+        self.bullets_used2 = 0
+
+        # Bullet parameters
+        self.powerbullet_angle_error = 5
+        self.powerbullet_multiplier = 1.5
+
+        # Score and winning conditions
+        self.player1_score = 0
+        self.player2_score = 0
+        self.winning_score = 1
+
+        # Turn management
+        self.turn_delay = 0.6
+        self.turn_delay_ticks = round(self.turn_delay * self.FPS)
+        self.player1_ready = False
+        self.player2_ready = False
+        self.last_shot_tick1 = -self.turn_delay_ticks
+        self.last_shot_tick2 = -self.turn_delay_ticks
+        self.player1_executing = None
+        self.player2_executing = None
+
+        # Player scripts
+        self.player_script_left = player_script_left
+        self.player_script_right = player_script_right
+        self.team_names = ["Player 1", "Player 2"]
+
+        # Optional latency.LatencyRecorder timing every decision
+        self.latency = None
+
+        # Accepted shots, as (tick, player, command); enough to replay a match
+        self.decisions = []
+
+        # Game state
+        self.game_over = False
+        self.round_counter = 0
+
+    def seed_streams(self, seed):
+        # Random streams: one for the engine and one per team script, all
+        # derived from the match seed so a seed fully reproduces a match
+        self.seed = seed
+        self.use_streams(RandomStream(f"{seed}:engine"),
+                         [RandomStream(f"{seed}:left"), RandomStream(f"{seed}:right")])
+
+    def use_streams(self, rng, script_rngs):
+        self.rng = rng
+        self.script_rngs = script_rngs
+        self.script_random_functions = [{name: getattr(rng, name) for name in RANDOM_FUNCTIONS}
+                                        for rng in script_rngs]
+
+    def launch_ball(self, velocity):
+        # Start a new stretch of free motion from the current position; the
+        # ball then moves in closed form until the next hit, bounce or reset
+        self.ball_origin = list(self.ball_pos)
+        self.ball_launch = list(velocity)
+        self.ball_stop = [stop_age(velocity[0], self.friction_powers), stop_age(velocity[1], self.friction_powers)]
+        self.ball_age = 0
+        self.ball_vel[:] = velocity
+
+    def place_ball(self):
+        # Position and velocity ball_age ticks after the launch: each tick the
+        # ball moves by its velocity, then friction slows it, and an axis
+        # slower than STOP_SPEED stops
+        age = self.ball_age
+        launch_x, launch_y = self.ball_launch
+        stop_x, stop_y = self.ball_stop
+        if launch_x:
+            self.ball_pos[0] = self.ball_origin[0] + launch_x * self.friction_sums[min(age, stop_x)]
+        if launch_y:
+            self.ball_pos[1] = self.ball_origin[1] + launch_y * self.friction_sums[min(age, stop_y)]
+        self.ball_vel[0] = launch_x * self.friction_powers[age] if age < stop_x else 0
+        self.ball_vel[1] = launch_y * self.friction_powers[age] if age < stop_y else 0
+
+    def update_ball(self):
+        self.ball_age += 1
+        self.place_ball()
+
+        if self.ball_vel[1] and (self.ball_pos[1] - self.BALL_RADIUS <= 0 or
+                                 self.ball_pos[1] + self.BALL_RADIUS >= self.HEIGHT):
+            self.launch_ball([self.ball_vel[0], -self.ball_vel[1]])
+        if self.ball_pos[0] - self.BALL_RADIUS <= 0:
+            self.player2_score += 1
+            self.reset_ball()
+        elif self.ball_pos[0] + self.BALL_RADIUS >= self.WIDTH:
+            self.player1_score += 1
+            self.reset_ball()
+
+    def reset_ball(self):
+        self.round_counter += 1
+        self.ball_pos[:] = [self.positions[self.round_counter % 5][0] + self.rng.randint(-5, 5),
+                           self.positions[self.round_counter % 5][1] + self.rng.randint(-5, 5)]
+        self.launch_ball([0, 0])
+        self.powerbullets1 = self.powerbulletscount
+        self.powerbullets2 = self.powerbulletscount
+        self.precisionbullets1 = self.precisionbulletscount
+        self.precisionbullets2 = self.precisionbulletscount
+        self.bullets.clear()
+        self.player1_executing = None
+        self.player2_executing = None
+        self.cannon1_power = 0
+        self.cannon2_power = 0
+
+    def handle_bullets(self):
+        pool = self.bullets
+        ox, oy, vx, vy, age, x, y = pool.ox, pool.oy, pool.vx, pool.vy, pool.age, pool.x, pool.y
+        width, height = self.WIDTH, self.HEIGHT
+        ball_x, ball_y = self.ball_pos
+        reach_squared = (self.BALL_RADIUS + self.BULLET_RADIUS) ** 2
+        hit = False
+
+        # Walk backwards so a swap-remove only moves bullets already stepped
+        for i in range(pool.count - 1, -1, -1):
+            bullet_age = age[i] = age[i] + 1
+            bullet_x = x[i] = ox[i] + bullet_age * vx[i]
+            bullet_y = y[i] = oy[i] + bullet_age * vy[i]
+
+            if bullet_x < 0 or bullet_x > width or bullet_y < 0 or bullet_y > height:
+                pool.remove(i)
+                continue
+
+            dx = ball_x - bullet_x
+            dy = ball_y - bullet_y
+            if dx * dx + dy * dy <= reach_squared:
+                angle = math.atan2(dy, dx)
+                multiplier = self.powerbullet_multiplier if pool.kind[i] == POWER else 1
+                self.ball_vel[0] += math.cos(angle) * pool.power[i] * self.power_increment * multiplier
+                self.ball_vel[1] += math.sin(angle) * pool.power[i] * self.power_increment * multiplier
+                pool.remove(i)
+                hit = True
+        if hit:
+            self.launch_ball(self.ball_vel)
+
+    def restart_game(self):
+        self.round_counter = 0
+        self.bullets_used1 = 0
+        self.bullets_used2 = 0
+        self.counter = self.game_time
+        self.ticks = 0
+        self.last_shot_tick1 = -self.turn_delay_ticks
+        self.last_shot_tick2 = -self.turn_delay_ticks
+        self.player1_score = 0
+        self.player2_score = 0
+        self.reset_ball()
+
+    def handle_player_turns(self):
+        # Update player readiness
+        self.player1_ready = self.ticks - self.last_shot_tick1 >= self.turn_delay_ticks
+        self.player2_ready = self.ticks - self.last_shot_tick2 >= self.turn_delay_ticks
+
+        # Handle player 1 execution
+        if self.player1_executing is not None:
+            self.execute_player1_shot()
+        elif self.player1_ready:
+            self.handle_player1_command()
+
+        # Handle player 2 execution
+        if self.player2_executing is not None:
+            self.execute_player2_shot()
+        elif self.player2_ready:
+            self.handle_player2_command()
+
+    def execute_player1_shot(self):
+        if self.cannon1_power < self.player1_executing[1] and self.cannon1_power < self.MAX_POWER:
+            self.cannon1_power += 1
+        else:
+            angle = self.player1_executing[0]
+            if self.player1_executing[2] == "power":
+                angle += self.rng.uniform(-self.powerbullet_angle_error, self.powerbullet_angle_error)
+            self.bullets.add(50, self.HEIGHT // 2, angle, self.cannon1_power,
+                             BULLET_TYPES[self.player1_executing[2]], self.BULLET_SPEED)
+            self.last_shot_tick1 = self.ticks
+            self.cannon1_power = 0
+            self.player1_executing = None
+
+    def handle_player1_command(self):
+        player1_command = self.request_decision(1)
+        if player1_command is not None:
+            angle, power, bullet_type = player1_command
+            self.angle1 = angle
+            if self.process_player_shot(1, angle, power, bullet_type):
+                self.decisions.append((self.ticks, 1, player1_command))
+                self.player1_ready = False
+
+    def execute_player2_shot(self):
+        if self.cannon2_power < self.player2_executing[1] and self.cannon2_power < self.MAX_POWER:
+            self.cannon2_power += 1
+        else:
+            self.bullets.add(self.WIDTH - 50, self.HEIGHT // 2,
+                             self.player2_executing[0], self.cannon2_power,
+                             BULLET_TYPES[self.player2_executing[2]], self.BULLET_SPEED)
+            self.last_shot_tick2 = self.ticks
+            self.cannon2_power = 0
+            self.player2_executing = None
+
+    def handle_player2_command(self):
+        player2_command = self.request_decision(2)
+        if player2_command is not None:
+            angle, power, bullet_type = player2_command
+            self.angle2 = angle
+            if self.process_player_shot(2, angle, power, bullet_type):
+                self.decisions.append((self.ticks, 2, player2_command))
+                self.player2_ready = False
+
+    def request_decision(self, player):
+        if self.latency is None:
+            return self.decide(player)
+        start = time.perf_counter()
+        command = self.decide(player)
+        self.latency.record(self.team_names[player - 1], time.perf_counter() - start)
+        return command
+
+    def decide(self, player):
+        script, args = self.script_call(player)
+        return self.call_script(player, script, *args)
+
+    def script_call(self, player):
+        # The script of a player and the arguments it is called with
+        if player == 1:
+            return self.player_script_left, (self.cannon1_pos, self.ball_pos, self.powerbullets1,
+                                             self.precisionbullets1, self.ball_vel)
+        return self.player_script_right, (self.cannon2_pos, self.ball_pos, self.powerbullets2,
+                                          self.precisionbullets2, self.ball_vel)
+
+    def call_script(self, player, script, *args):
+        return call_with_random(self.script_random_functions[player - 1], script, *args)
+
+    def process_player_shot(self, player, angle, power, bullet_type):
+        if player == 1:
+            if bullet_type == "power" and self.powerbullets1 > 0:
+                self.player1_executing = (angle, power, bullet_type)
+                self.powerbullets1 -= 1
+                self.bullets_used1 += 1
+                return True
+            elif bullet_type == "precision" and self.precisionbullets1 > 0:
+                self.player1_executing = (angle, power, bullet_type)
+                self.precisionbullets1 -= 1
+                self.bullets_used1 += 1
+                return True
+        else:
+            if bullet_type == "power" and self.powerbullets2 > 0:
+                self.player2_executing = (angle, power, bullet_type)
+                self.powerbullets2 -= 1
+                self.bullets_used2 += 1
+                return True
+            elif bullet_type == "precision" and self.precisionbullets2 > 0:
+                self.player2_executing = (angle, power, bullet_type)
+                self.precisionbullets2 -= 1
+                self.bullets_used2 += 1
+                return True
+        return False
+
+    def tick_timer(self):
+        # Called once per game second of simulation ticks
+        self.counter -= 1
+        if self.counter <= 0:
+            self.game_over = True
+
+    def check_rules(self):
+        # Check for game-ending conditions
+        if self.player1_score >= self.winning_score or self.player2_score >= self.winning_score:
+            self.game_over = True
+
+        # Check if ball is not moving and both players are out of bullets
+        if (self.ball_vel[0] == 0 and self.ball_vel[1] == 0 and
+            self.powerbullets1 == 0 and self.powerbullets2 == 0 and
+            self.precisionbullets1 == 0 and self.precisionbullets2 == 0):
+            if abs(self.ball_pos[0] - self.cannon1_pos[0]) > abs(self.ball_pos[0] - self.cannon2_pos[0]):
+                self.player1_score += 1
+            else:
+                self.player2_score += 1
+            self.reset_ball()
+
+    def get_state(self):
+        # Everything that changes during a match, copied so the engine can keep running
+        state = {name: getattr(self, name) for name in STATE_FIELDS}
+        state["ball_pos"] = list(self.ball_pos)
+        state["ball_vel"] = list(self.ball_vel)
+        state["ball_origin"] = list(self.ball_origin)
+        state["ball_launch"] = list(self.ball_launch)
+        state["ball_stop"] = list(self.ball_stop)
+        state["bullets"] = self.bullets.snapshot()
+        state["rng"] = self.rng.getstate()
+        state["script_rngs"] = [rng.getstate() for rng in self.script_rngs]
+        return state
+
+    def set_state(self, state):
+        for name in STATE_FIELDS:
+            setattr(self, name, state[name])
+        self.ball_pos = list(state["ball_pos"])
+        self.ball_vel = list(state["ball_vel"])
+        self.ball_origin = list(state["ball_origin"])
+        self.ball_launch = list(state["ball_launch"])
+        self.ball_stop = list(state["ball_stop"])
+        self.bullets.restore(state["bullets"])
+        self.rng.setstate(state["rng"])
+        # Script streams are optional, replays do not call the scripts
+        for rng, rng_state in zip(self.script_rngs, state.get("script_rngs", ())):
+            rng.setstate(rng_state)
+        self.restored()
+
+    def restored(self):
+        # Called after set_state() and restore() so subclasses can reset what
+        # they derive from the match state
+        pass
+
+    def snapshot(self):
+        # Everything that changes during a match as an EngineState; the
+        # cost is proportional to the bullets in flight, not to the match
+        ball_pos, ball_vel, ball_origin, ball_launch, ball_stop = (
+            self.ball_pos, self.ball_vel, self.ball_origin, self.ball_launch, self.ball_stop)
+        values = _state_values(self) + (ball_pos[0], ball_pos[1], ball_vel[0], ball_vel[1],
+                                        ball_origin[0], ball_origin[1], ball_launch[0], ball_launch[1],
+                                        ball_stop[0], ball_stop[1])
+        return EngineState(values, self.bullets.copy_columns(), self.rng.getstate(),
+                           tuple(rng.getstate() for rng in self.script_rngs), self.seed, len(self.decisions))
+
+    def restore(self, state):
+        values = state.values
+        for name, value in zip(STATE_FIELDS, values):
+            setattr(self, name, value)
+        (self.ball_pos[0], self.ball_pos[1], self.ball_vel[0], self.ball_vel[1],
+         self.ball_origin[0], self.ball_origin[1], self.ball_launch[0], self.ball_launch[1],
+         self.ball_stop[0], self.ball_stop[1]) = values[len(STATE_FIELDS):]
+        self.bullets.restore_columns(state.bullets)
+        self.rng.setstate(state.rng)
+        if state.script_rngs is not None:
+            for rng, rng_state in zip(self.script_rngs, state.script_rngs):
+                rng.setstate(rng_state)
+        # Forget the decisions of branches played since the snapshot
+        self.seed = state.seed
+        del self.decisions[state.decision_count:]
+        self.restored()
+
+    def fork(self, seed=None):
+        # Independent engine at the same point of the match, with copies of
+        # the random streams or, given seed, with the streams of that seed
+        # (cheaper, for rollouts that should each play out differently).
+        # Rules, tables, positions and scripts are shared rather than
+        # copied; a script that keeps state of its own shares it.
+        engine = copy.copy(self)
+        engine.ball_pos = list(self.ball_pos)
+        engine.ball_vel = list(self.ball_vel)
+        engine.ball_origin = list(self.ball_origin)
+        engine.ball_launch = list(self.ball_launch)
+        engine.ball_stop = list(self.ball_stop)
+        engine.bullets = self.bullets.copy()
+        if seed is None:
+            engine.use_streams(copy_random(self.rng), [copy_random(rng) for rng in self.script_rngs])
+        else:
+            engine.seed_streams(seed)
+        engine.decisions = list(self.decisions)
+        engine.latency = None
+        return engine
+
+    def winner(self):
+        # Fewer bullets used breaks a tie on goals; 0 means a full tie
+        if self.player1_score > self.player2_score:
+            return 1
+        elif self.player2_score > self.player1_score:
+            return 2
+        elif self.bullets_used1 < self.bullets_used2:
+            return 1
+        elif self.bullets_used2 < self.bullets_used1:
+            return 2
+        return 0
+
+    def step(self):
+        # One fixed simulation tick; all match timing is counted in these
+        self.handle_player_turns()
+        if self.ticks > 0 and self.ticks % self.FPS == 0:
+            self.tick_timer()
+        self.check_rules()
+        self.update_ball()
+        self.handle_bullets()
+        self.ticks += 1
+
+    def charge_ticks(self, power, target):
+        # Ticks a cannon spends charging from power before it fires
+        return max(0, math.ceil(min(target, self.MAX_POWER) - power))
+
+    def next_decision(self, player, ready_tick):
+        # First tick from ready_tick on at which the player might shoot; a
+        # script can shoot on any tick it is asked
+        return ready_tick
+
+    def quiet_end(self, limit=None):
+        # First tick from now on which a script is asked to shoot, a charged
+        # cannon fires, a goal ends the match or the clock runs out; capped
+        # at limit ticks ahead
+        start = self.ticks
+        if self.game_over or self.player1_score >= self.winning_score or self.player2_score >= self.winning_score:
+            return start
+        end = start + (self.game_time * self.FPS if limit is None else limit)
+
+        # Players
+        for player, executing, power, last_shot in (
+                (1, self.player1_executing, self.cannon1_power, self.last_shot_tick1),
+                (2, self.player2_executing, self.cannon2_power, self.last_shot_tick2)):
+            if executing is not None:
+                end = min(end, start + self.charge_ticks(power, executing[1]))
+            else:
+                end = min(end, self.next_decision(player, last_shot + self.turn_delay_ticks))
+            if end <= start:
+                return start
+
+        # Clock
+        next_second = max(self.FPS, -(-start // self.FPS) * self.FPS)
+        return min(end, next_second + (self.counter - 1) * self.FPS)
+
+    def skip_to(self, end):
+        # Jump to tick end; the ticks in between may only fly bullets, move
+        # the ball, charge cannons and run the clock. Returns the ticks skipped.
+        start = self.ticks
+        steps = end - start
+        if steps <= 0:
+            return 0
+        self.counter -= (end - 1) // self.FPS - (max(start, 1) - 1) // self.FPS
+        if self.player1_executing is not None:
+            self.cannon1_power += steps
+        if self.player2_executing is not None:
+            self.cannon2_power += steps
+        self.player1_ready = end - 1 - self.last_shot_tick1 >= self.turn_delay_ticks
+        self.player2_ready = end - 1 - self.last_shot_tick2 >= self.turn_delay_ticks
+        self.bullets.advance(steps)
+        self.ball_age += steps
+        self.place_ball()
+        self.ticks = end
+        return steps
+
+    def skip_quiet_ticks(self, limit=None):
+        # Jump over ticks in which only bullets fly, cannons charge and the
+        # clock runs while the ball is at rest. Stops just before the next
+        # tick where anything else happens, so the match plays out exactly
+        # as stepping tick by tick. Returns the ticks skipped.
+        if self.ball_vel[0] != 0 or self.ball_vel[1] != 0:
+            return 0
+        if not (self.powerbullets1 or self.powerbullets2 or self.precisionbullets1 or self.precisionbullets2):
+            return 0
+        start = self.ticks
+        end = self.quiet_end(limit)
+        if end <= start:
+            return 0
+
+        # Stop before a bullet leaves the field or reaches the ball
+        event = self.bullets.next_event(self.ball_pos[0], self.ball_pos[1], self.BALL_RADIUS + self.BULLET_RADIUS,
+                                        self.WIDTH, self.HEIGHT, end - start)
+        if event is not None:
+            end = start + event - 1
+        return self.skip_to(end)
+
+    def run_until(self, tick):
+        # Play up to tick, or to the end of the match if that comes first
+        while self.ticks < tick and not self.game_over:
+            self.skip_quiet_ticks(tick - self.ticks)
+            if self.ticks < tick:
+                self.step()
+
+    def play(self):
+        while not self.game_over:
+            self.skip_quiet_ticks()
+            self.step()
+        return self.result()
+
+    def result(self):
+        return {
+            "player1_score": self.player1_score,
+            "player2_score": self.player2_score,
+            "bullets_used1": self.bullets_used1,
+            "bullets_used2": self.bullets_used2,
+            "winner": self.winner(),
+            "ticks": self.ticks,
+            "seed": self.seed,
+        }
+
+
+def call_with_random(functions, script, *args):
+    # Team scripts call the random module's functions, so point those at
+    # the player's stream (functions of its Random) for the duration of the call
+    with RANDOM_LOCK:
+        outer_functions = {name: random.__dict__[name] for name in RANDOM_FUNCTIONS}
+        random.__dict__.update(functions)
+        try:
+            return script(*args)
+        finally:
+            random.__dict__.update(outer_functions)
+
+
+def copy_random(rng):
+    # Skips the seeding a new Random does, setstate() replaces it anyway;
+    # a RandomStream shares its cached state tuple with the copy
+    copied = rng.__class__.__new__(rng.__class__)
+    copied.setstate(rng.getstate())
+    return copied
+
+
+def run_match(player_script_left, player_script_right, seed=None):
+    return MatchEngine(player_script_left, player_script_right, seed).play()
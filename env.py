@@ -0,0 +1,87 @@
+import numpy as np
+
+from batch import MAX_BULLETS, NO_SHOT, BatchEngine
+
+# Columns of an observation row; the first seven are the player_script
+# arguments (cannon_pos, ball_pos, power and precision bullets, ball_vel)
+OBS_FIELDS = ("cannon_x", "cannon_y", "ball_x", "ball_y", "power_bullets", "precision_bullets",
+              "ball_vx", "ball_vy", "ready", "cannon_power", "own_score", "opponent_score", "time_left")
+
+
+class VectorEnv:
+    """Gym-style training environment over a BatchEngine of n matches.
+
+    The agent plays one side of every match and the opponent the other,
+    either with a regular player_script or with actions passed to step().
+    Actions are (n, 3) arrays of [angle, power, type code] as in
+    BatchEngine.step(); step() plays frame_skip ticks and each match takes
+    its action at the first of them in which the agent may shoot.
+
+    Observations are (n, len(OBS_FIELDS)) float64 arrays, rewards the change
+    in the agent's goal difference and done flags the finished matches.
+    Finished matches stay over until the next reset().
+    """
+
+    def __init__(self, n, opponent=None, side=0, frame_skip=1, max_bullets=MAX_BULLETS):
+        self.n = n
+        self.opponent = opponent
+        self.side = side
+        self.frame_skip = frame_skip
+        self.max_bullets = max_bullets
+        self.engine = None
+
+    def reset(self, seeds=None):
+        self.engine = BatchEngine(self.n, seeds, self.max_bullets)
+        self.difference = self.goal_difference()
+        return self.observe()
+
+    def observe(self, side=None):
+        # Observation rows of every match, seen from side (the agent's by default)
+        side = self.side if side is None else side
+        engine = self.engine
+        obs = np.empty((self.n, len(OBS_FIELDS)), dtype=np.float64)
+        obs[:, 0:2] = engine.cannon_pos[side]
+        obs[:, 2:4] = engine.ball_pos
+        obs[:, 4] = engine.power_bullets[:, side]
+        obs[:, 5] = engine.precision_bullets[:, side]
+        obs[:, 6:8] = engine.ball_vel
+        obs[:, 8] = engine.ready(side)
+        obs[:, 9] = engine.cannon_power[:, side]
+        obs[:, 10] = engine.scores[:, side]
+        obs[:, 11] = engine.scores[:, 1 - side]
+        obs[:, 12] = engine.counter
+        return obs
+
+    def goal_difference(self):
+        return self.engine.scores[:, self.side] - self.engine.scores[:, 1 - self.side]
+
+    def first_ready(self, side, actions, taken):
+        # Actions for matches where side may shoot for the first time this step
+        ready = self.engine.ready(side) & ~taken
+        taken |= ready
+        return np.where(ready[:, None], actions, NO_SHOT)
+
+    def step(self, actions, opponent_actions=None):
+        engine = self.engine
+        actions = np.asarray(actions, dtype=np.float64).reshape(self.n, 3)
+        if opponent_actions is not None:
+            opponent_actions = np.asarray(opponent_actions, dtype=np.float64).reshape(self.n, 3)
+        other = 1 - self.side
+        taken = np.zeros(self.n, dtype=bool)
+        opponent_taken = np.zeros(self.n, dtype=bool)
+
+        for _ in range(self.frame_skip):
+            if engine.game_over.all():
+                break
+            sides = [None, None]
+            sides[self.side] = self.first_ready(self.side, actions, taken)
+            if opponent_actions is not None:
+                sides[other] = self.first_ready(other, opponent_actions, opponent_taken)
+            elif self.opponent is not None:
+                sides[other] = engine.script_actions(self.opponent, other)
+            engine.step(*sides)
+
+        difference = self.goal_difference()
+        reward = (difference - self.difference).astype(np.float64)
+        self.difference = difference
+        return self.observe(), reward, engine.game_over.copy(), {"winner": engine.winner()}
@@ -0,0 +1,156 @@
+import bisect
+import math
+
+from bullets import leave_time, sweep_circle
+from engine import MatchEngine
+
+
+class EventEngine(MatchEngine):
+    """MatchEngine that jumps from event to event instead of stepping every tick.
+
+    Between a hit, bounce or reset the ball follows the closed form of
+    MatchEngine.place_ball() and bullets fly in straight lines, so the next
+    tick on which anything happens (a bullet hits the ball or leaves the
+    field, the ball bounces, scores or stops, a cannon fires, a script is
+    due, the clock runs out) can be found without simulating the ticks
+    before it. Those ticks are skipped and the event tick itself is an
+    ordinary step(), so results match the tick engine exactly.
+    """
+
+    def launch_ball(self, velocity):
+        super().launch_ball(velocity)
+        # Age of the next ball event along this launch, found on first use
+        self.ball_event_age = None
+
+    def restored(self):
+        self.ball_event_age = None
+
+    def skip_quiet_ticks(self, limit=None):
+        ball_moving = self.ball_vel[0] != 0 or self.ball_vel[1] != 0
+        if not ball_moving and not (self.powerbullets1 or self.powerbullets2 or
+                                    self.precisionbullets1 or self.precisionbullets2):
+            return 0
+        start = self.ticks
+        end = self.quiet_end(limit)
+        if end <= start:
+            return 0
+
+        # Stop before the ball or a bullet does anything but fly
+        if ball_moving:
+            if self.ball_event_age is None:
+                self.ball_event_age = self.next_ball_event()
+            end = min(end, start + self.ball_event_age - self.ball_age - 1)
+        event = self.next_bullet_event(end - start)
+        if event is not None:
+            end = start + event - 1
+        return self.skip_to(end)
+
+    def ball_at(self, age):
+        # Ball position age ticks after its launch, as place_ball() computes it
+        sums = self.friction_sums
+        return (self.ball_origin[0] + self.ball_launch[0] * sums[min(age, self.ball_stop[0])],
+                self.ball_origin[1] + self.ball_launch[1] * sums[min(age, self.ball_stop[1])])
+
+    def crossing(self, axis, low, high, predicate):
+        # First ball age in [low, high] at which the monotone predicate on the
+        # ball position holds, or None. The friction sums give the candidate
+        # directly; the exact predicate then settles float rounding.
+        launch = self.ball_launch[axis]
+        if not launch:
+            return low if predicate(low) else None
+        if predicate(low):
+            return low
+        # Past its stop age an axis no longer moves
+        last = min(high, max(low, self.ball_stop[axis]))
+        edge = self.BALL_RADIUS if launch < 0 else (self.WIDTH, self.HEIGHT)[axis] - self.BALL_RADIUS
+        age = bisect.bisect_left(self.friction_sums, (edge - self.ball_origin[axis]) / launch, low, last + 1)
+        while age > low and predicate(age - 1):
+            age -= 1
+        while age <= last and not predicate(age):
+            age += 1
+        return age if age <= last else None
+
+    def next_ball_event(self):
+        # Ball age at which the ball next scores, bounces or comes to rest
+        age = self.ball_age
+        radius = self.BALL_RADIUS
+        stop_x, stop_y = self.ball_stop
+        low, high = age + 1, max(age + 1, stop_x, stop_y)
+
+        def goal(k):
+            x = self.ball_at(k)[0]
+            return x - radius <= 0 or x + radius >= self.WIDTH
+
+        def wall(k):
+            y = self.ball_at(k)[1]
+            return y - radius <= 0 or y + radius >= self.HEIGHT
+
+        # The last moving axis stops, unless something happens first
+        first = high
+        goal_age = self.crossing(0, low, first, goal)
+        if goal_age is not None:
+            first = goal_age
+        # A bounce needs vertical speed left after the tick
+        if low <= min(first, stop_y - 1):
+            bounce_age = self.crossing(1, low, min(first, stop_y - 1), wall)
+            if bounce_age is not None:
+                first = bounce_age
+        return first
+
+    def next_bullet_event(self, limit):
+        # Fewest ticks (1 to limit) until a bullet leaves the field or
+        # touches the ball; None if none does
+        pool = self.bullets
+        age = self.ball_age
+        width, height = self.WIDTH, self.HEIGHT
+        reach = self.BALL_RADIUS + self.BULLET_RADIUS
+        reach_squared = reach * reach
+        # The ball never moves faster than it does now until its next launch
+        ball_speed = math.hypot(*self.ball_vel)
+        ball_x, ball_y = self.ball_pos
+        travel = ball_speed * limit
+
+        first = None
+        for i in range(pool.count):
+            ox, oy, vx, vy, bullet_age = pool.ox[i], pool.oy[i], pool.vx[i], pool.vy[i], pool.age[i]
+
+            def outside(k):
+                x = ox + (bullet_age + k) * vx
+                y = oy + (bullet_age + k) * vy
+                return x < 0 or x > width or y < 0 or y > height
+
+            # Leaving the field is monotone along a straight line; start
+            # looking a tick before the continuous exit time
+            exit_age = min(leave_time(ox, vx, 0, width), leave_time(oy, vy, 0, height))
+            leave = max(1, math.ceil(exit_age) - bullet_age - 1) if exit_age < math.inf else limit + 1
+            while leave <= limit and not outside(leave):
+                leave += 1
+            if leave <= limit:
+                first = leave
+                limit = leave - 1
+
+            # Touching the ball: a swept test against everywhere the ball
+            # can get to rules out most bullets at once
+            contact = sweep_circle(ox, oy, vx, vy, ball_x, ball_y, reach + travel + 1)
+            if contact is None or contact[1] < bullet_age + 1 or contact[0] > bullet_age + limit:
+                continue
+
+            # Otherwise look ahead no further than the gap could close at full
+            # bullet and ball speed, then check the tick exactly
+            rate = math.hypot(vx, vy) + ball_speed
+            k = max(1, math.floor(contact[0]) - bullet_age)
+            while k <= limit:
+                at_x, at_y = self.ball_at(age + k)
+                dx = at_x - (ox + (bullet_age + k) * vx)
+                dy = at_y - (oy + (bullet_age + k) * vy)
+                distance_squared = dx * dx + dy * dy
+                if distance_squared <= reach_squared:
+                    first = k
+                    limit = k - 1
+                    break
+                k += max(1, math.floor((math.sqrt(distance_squared) - reach) / rate - 1e-9))
+        return first
+
+
+def run_match(player_script_left, player_script_right, seed=None):
+    return EventEngine(player_script_left, player_script_right, seed).play()
@@ -1,13 +1,28 @@
-import os
-import importlib
-import random
+import argparse
 import pygame
 import math
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from assets import Assets
+from bullets import POWER
+from engine import MatchEngine
+from registry import TeamRegistry
+from latency import LatencyRecorder, timed_call
+from render import ROTATION_STEP, DirtyRenderer, RenderCache, SpriteCache, paint_field
+from winprob import estimate
+from workers import ScriptWorker
+
+# Live win-probability bar: most rollouts per estimate and seconds each may take
+WIN_ROLLOUTS = 400
+WIN_TIME_LIMIT = 0.8
 
 class TeamSelector:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, script_budget=None, assets=None, registry=None):
         self.WIDTH = screen_width
         self.HEIGHT = screen_height
+        self.script_budget = script_budget
+        self.assets = assets or Assets()
+        self.registry = registry or TeamRegistry()
         self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
         self.clock = pygame.time.Clock()
         self.FPS = 60
@@ -20,8 +35,8 @@ class TeamSelector:
         self.BG_COLOR = (18, 18, 18)
         
         # Fonts
-        self.title_font = pygame.font.Font(None, 64)
-        self.team_font = pygame.font.Font(None, 36)
+        self.title_font = self.assets.font(64)
+        self.team_font = self.assets.font(36)
         
         # Selection state
         self.team1_selected = None
@@ -36,26 +51,11 @@ class TeamSelector:
         self.button_spacing = 10
 
     def get_team_scripts(self):
-        teams = []
-        teams_dir = "teams"
-        
-        if not os.path.exists(teams_dir):
-            print(f"Warning: {teams_dir} directory not found")
-            return teams
-
-        for file in os.listdir(teams_dir):
-            if file.endswith(".py") and not file.startswith("__"):
-                team_name = file[:-3]  # Remove .py extension
-                teams.append(team_name)
-        
-        return sorted(teams)
+        return self.registry.teams()
 
     def draw_selection_screen(self):
         # Draw gradient background
-        for y in range(self.HEIGHT):
-            alpha = y / self.HEIGHT
-            color = [int(self.BG_COLOR[i] + (self.PRIMARY[i] - self.BG_COLOR[i]) * alpha * 0.15) for i in range(3)]
-            pygame.draw.line(self.screen, tuple(color), (0, y), (self.WIDTH, y))
+        self.screen.blit(self.assets.gradient((self.WIDTH, self.HEIGHT), self.BG_COLOR, self.PRIMARY), (0, 0))
 
         # Draw title
         title_text = self.title_font.render("Select Teams", True, self.WHITE)
@@ -182,10 +182,15 @@ class TeamSelector:
     def load_team_scripts(self):
         try:
             # Import the selected team scripts
-            team1_module = importlib.import_module(f"teams.{self.team1_selected}")
-            team2_module = importlib.import_module(f"teams.{self.team2_selected}")
+            team1_script = self.registry.script(self.team1_selected)
+            team2_script = self.registry.script(self.team2_selected)
             
-            return False, team1_module.player_script, team2_module.player_script
+            # Run each team in its own worker process when decisions have a time budget
+            if self.script_budget is not None:
+                team1_script = ScriptWorker(self.team1_selected, self.script_budget)
+                team2_script = ScriptWorker(self.team2_selected, self.script_budget)
+            
+            return False, team1_script, team2_script
         except Exception as e:
             print(f"Error loading team scripts: {e}")
             return True, None, None
@@ -193,6 +198,9 @@ class TeamSelector:
     def run(self):
         running = True
         while running:
+            # Teams added, fixed or removed while the menu is open
+            self.teams = self.get_team_scripts()
+            
             self.screen.fill(self.BG_COLOR)
             self.draw_selection_screen()
             running, script1, script2 = self.handle_events()
@@ -205,38 +213,53 @@ class TeamSelector:
         
         return None, None
 
-class FootballGame:
-    def __init__(self):
+class FootballGame(MatchEngine):
+    def __init__(self, script_budget=None, async_decisions=None, latency_report=None, dirty_rects=False,
+                 rotation_step=ROTATION_STEP, speed=1, render_every=1, win_probability=False):
         pygame.init()
         self.WIDTH = 800
         self.HEIGHT = 600
         
+        # Fonts and backgrounds shared with the team selector
+        assets = Assets()
+        
+        # Team scripts, reloaded in the background whenever a team file is saved
+        registry = TeamRegistry()
+        registry.start()
+        
         # Create team selector and get selected teams
-        selector = TeamSelector(self.WIDTH, self.HEIGHT)
+        selector = TeamSelector(self.WIDTH, self.HEIGHT, script_budget, assets, registry)
         player_script_left, player_script_right = selector.run()
         
         if player_script_left is None or player_script_right is None:
+            registry.stop()
             raise SystemExit("Team selection cancelled")
             
         # Initialize the rest of the game with selected teams
-        self.init_game(player_script_left, player_script_right)
-
-    def init_game(self, player_script_left, player_script_right):
+        self.init_game(player_script_left, player_script_right, async_decisions, latency_report, dirty_rects,
+                       assets, rotation_step, speed, render_every, win_probability)
+        self.team_names = [selector.team1_selected, selector.team2_selected]
+        self.registry = registry
+
+    def init_game(self, player_script_left, player_script_right, async_decisions=None, latency_report=None,
+                  dirty_rects=False, assets=None, rotation_step=ROTATION_STEP, speed=1, render_every=1,
+                  win_probability=False):
         # Initialize pygame
         pygame.init()
         
+        # Match state and rules
+        self.init_engine(player_script_left, player_script_right)
+        
         # Screen settings
-        self.WIDTH = 800
-        self.HEIGHT = 600
         self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
         pygame.display.set_caption("Turn-Based Football Game")
         
-        # Load and prepare cannon sprites
-        self.cannon1_img = pygame.image.load("cannon.png")
-        self.cannon2_img = pygame.image.load("cannon.png")
-        self.cannon1_img = pygame.transform.scale(self.cannon1_img, (60, 20))
-        self.cannon2_img = pygame.transform.scale(self.cannon2_img, (60, 20))
-        self.cannon2_img = pygame.transform.flip(self.cannon2_img, False, True)
+        # Load and prepare cannon sprites, converted to the display format
+        self.assets = assets or Assets()
+        images = [("cannon.png", (60, 20)), ("cannon.png", (60, 20), (False, True))]
+        print(f"Loaded {len(images)} images in {1000 * self.assets.preload(images):.1f} ms")
+        self.cannon1_img = self.assets.image("cannon.png", (60, 20))
+        self.cannon2_img = self.assets.image("cannon.png", (60, 20), (False, True))
         
         # Colors
         self.WHITE = (255, 255, 255)
@@ -246,97 +269,75 @@ class FootballGame:
         self.GREEN = (0, 255, 0)
         self.GRAY = (200, 200, 200)
         
-        # Clock settings
-        self.game_time = 60
+        # Clock settings (match time is counted in engine ticks)
         self.clock = pygame.time.Clock()
-        self.FPS = 60
-        self.counter = self.game_time
-        pygame.time.set_timer(pygame.USEREVENT, 1000)
-        
-        # Ball settings
-        self.BALL_RADIUS = 20
-        self.positions = [(self.WIDTH // 2, self.HEIGHT // 2),
-                         (self.WIDTH // 2, self.HEIGHT // 2 + 50),
-                         (self.WIDTH // 2, self.HEIGHT // 2 - 50),
-                         (self.WIDTH // 2, self.HEIGHT // 2 + 100),
-                         (self.WIDTH // 2 - 50, self.HEIGHT // 2 - 100)]
-        self.ball_pos = [self.WIDTH // 2, self.HEIGHT // 2]
-        self.ball_vel = [0, 0]
-        self.FRICTION = 0.995
-        
-        # Cannon settings
-        self.cannon1_pos = (50, self.HEIGHT // 2)
-        self.cannon2_pos = (self.WIDTH - 50, self.HEIGHT // 2)
-        self.CANNON_RADIUS = 30
-        self.BULLET_RADIUS = 5
-        self.MAX_POWER = 30
-        self.BULLET_SPEED = 15
-        self.power_increment = 0.13
-        
-        # Game state
-        self.cannon1_angle = 45
-        self.cannon2_angle = 45
-        self.cannon1_power = 0
-        self.cannon2_power = 0
-        self.bullets = []
-        self.angle1 = 0
-        self.angle2 = 180
-        
-        # Bullet counts
-        self.powerbulletscount = 5
-        self.precisionbulletscount = 10
-        self.powerbullets1 = self.powerbulletscount
-        self.powerbullets2 = self.powerbulletscount
-        self.precisionbullets1 = self.precisionbulletscount
-        self.precisionbullets2 = self.precisionbulletscount
-        self.bullets_used1 = 0
-        self.bullets_used2 = 0
-        
-        # Bullet parameters
-        self.powerbullet_angle_error = 5
-        self.powerbullet_multiplier = 1.5
-        
-        # Score and winning conditions
-        self.player1_score = 0
-        self.player2_score = 0
-        self.winning_score = 1
-        
-        # Turn management
-        self.turn_delay = 0.6
-        self.player1_ready = False
-        self.player2_ready = False
-        self.last_shot_time1 = 0
-        self.last_shot_time2 = 0
-        self.player1_executing = None
-        self.player2_executing = None
         
         # Font initialization
-        self.font = pygame.font.Font(None, 36)
-        self.font_bulletcount = pygame.font.Font(None, 24)
-        
-        # Player scripts
-        self.player_script_left = player_script_left
-        self.player_script_right = player_script_right
-        
-        # Game state
+        self.font = self.assets.font(36)
+        self.font_bulletcount = self.assets.font(24)
+        
+        # Pre-rendered field and HUD text, redrawn only when they change
+        self.render_cache = RenderCache()
+        
+        # Cannon sprites pre-rotated per rotation_step degrees of aim
+        self.sprites = SpriteCache(rotation_step)
+        
+        # Optionally push only the changed parts of each frame to the display
+        self.dirty_renderer = None
+        if dirty_rects:
+            field = self.render_cache.background("field", (self.WIDTH, self.HEIGHT), self.paint_field)
+            self.dirty_renderer = DirtyRenderer(self.screen, field)
+        
+        # Non-blocking decisions: scripts run in a thread or process pool and the
+        # game keeps stepping and drawing until their answer arrives
+        self.decision_executor = None
+        self.pending_decisions = [None, None]
+        if async_decisions == "thread":
+            self.decision_executor = ThreadPoolExecutor(max_workers=2)
+        elif async_decisions == "process":
+            self.decision_executor = ProcessPoolExecutor(max_workers=2)
+        
+        # Decision latency report, written whenever a match ends
+        self.latency_report = latency_report
+        if latency_report is not None:
+            self.latency = LatencyRecorder()
+        
+        # Turbo: engine ticks per displayed frame, changed live with [ and ],
+        # and drawing only every render_every-th frame
+        self.MAX_SPEED = 64
+        self.speed = max(1, min(int(speed), self.MAX_SPEED))
+        self.render_every = max(1, int(render_every))
+        self.frame = 0
+        
+        # Live win probability: rollouts from the current state run in a
+        # worker process and a new estimate is started about once a second
+        self.win_executor = ProcessPoolExecutor(max_workers=1) if win_probability else None
+        self.win_future = None
+        self.win_estimate = None
+        self.win_started = 0
+        
+        # Optional registry.TeamRegistry whose latest scripts each new match uses
+        self.registry = None
+        
+        # Window state
         self.running = True
-        self.game_over = False
-        self.round_counter = 0
 
     def draw_field(self):
-        self.screen.fill((34, 139, 34))
-        pygame.draw.rect(self.screen, self.WHITE, (50, 50, self.WIDTH - 100, self.HEIGHT - 100), 5)
-        pygame.draw.line(self.screen, self.WHITE, (self.WIDTH // 2, 50), (self.WIDTH // 2, self.HEIGHT - 50), 5)
-        pygame.draw.circle(self.screen, self.WHITE, (self.WIDTH // 2, self.HEIGHT // 2), 70, 5)
-        pygame.draw.rect(self.screen, self.WHITE, (50, self.HEIGHT // 2 - 75, 50, 150), 5)
-        pygame.draw.rect(self.screen, self.WHITE, (self.WIDTH - 100, self.HEIGHT // 2 - 75, 50, 150), 5)
+        field = self.render_cache.background("field", (self.WIDTH, self.HEIGHT), self.paint_field)
+        self.screen.blit(field, (0, 0))
+
+    def paint_field(self, surface):
+        paint_field(surface, self.WIDTH, self.HEIGHT)
 
     def draw_cannon(self, x, y, img, angle):
-        rotated_img = pygame.transform.rotate(img, angle)
-        img_rect = rotated_img.get_rect(center=(x, y))
+        rotated_img, img_rect = self.cannon_sprite(x, y, img, angle)
         self.screen.blit(rotated_img, img_rect.topleft)
         return angle
 
+    def cannon_sprite(self, x, y, img, angle):
+        rotated_img = self.sprites.rotated(img, angle)
+        return rotated_img, rotated_img.get_rect(center=(x, y))
+
     def draw_power_bar(self, x, y, power, color):
         pygame.draw.rect(self.screen, self.GRAY, (x - 25, y + 40, 50, 10))
         pygame.draw.rect(self.screen, color, (x - 25, y + 40, int(50 * (power / self.MAX_POWER)), 10))
@@ -345,72 +346,97 @@ class FootballGame:
         pygame.draw.circle(self.screen, self.GREEN, self.ball_pos, self.BALL_RADIUS)
 
     def draw_bullets(self):
-        for bullet in self.bullets:
-            color = self.RED if bullet[4] == "power" else self.BLACK
-            pygame.draw.circle(self.screen, color, (int(bullet[0]), int(bullet[1])), self.BULLET_RADIUS)
-
-    def update_ball(self):
-        self.ball_pos[0] += self.ball_vel[0]
-        self.ball_pos[1] += self.ball_vel[1]
-        
-        self.ball_vel[0] *= self.FRICTION
-        self.ball_vel[1] *= self.FRICTION
-        
-        if abs(self.ball_vel[0]) < 0.1:
-            self.ball_vel[0] = 0
-        if abs(self.ball_vel[1]) < 0.1:
-            self.ball_vel[1] = 0
-            
-        if self.ball_pos[1] - self.BALL_RADIUS <= 0 or self.ball_pos[1] + self.BALL_RADIUS >= self.HEIGHT:
-            self.ball_vel[1] = -self.ball_vel[1]
-        if self.ball_pos[0] - self.BALL_RADIUS <= 0:
-            self.player2_score += 1
-            self.reset_ball()
-        elif self.ball_pos[0] + self.BALL_RADIUS >= self.WIDTH:
-            self.player1_score += 1
-            self.reset_ball()
-
-    def reset_ball(self):
-        self.round_counter += 1
-        self.ball_pos[:] = [self.positions[self.round_counter % 5][0] + random.randint(-5, 5),
-                           self.positions[self.round_counter % 5][1] + random.randint(-5, 5)]
-        self.ball_vel[:] = [0, 0]
-        self.powerbullets1 = self.powerbulletscount
-        self.powerbullets2 = self.powerbulletscount
-        self.precisionbullets1 = self.precisionbulletscount
-        self.precisionbullets2 = self.precisionbulletscount
-        self.bullets.clear()
-        self.player1_executing = None
-        self.player2_executing = None
-        self.cannon1_power = 0
-        self.cannon2_power = 0
-
-    def handle_bullets(self):
-        for bullet in self.bullets[:]:
-            bullet[0] += math.cos(math.radians(bullet[2])) * self.BULLET_SPEED
-            bullet[1] -= math.sin(math.radians(bullet[2])) * self.BULLET_SPEED
-            
-            if (bullet[0] < 0 or bullet[0] > self.WIDTH or
-                    bullet[1] < 0 or bullet[1] > self.HEIGHT):
-                self.bullets.remove(bullet)
-                continue
-            
-            dist = math.hypot(bullet[0] - self.ball_pos[0], bullet[1] - self.ball_pos[1])
-            if dist <= self.BALL_RADIUS + self.BULLET_RADIUS:
-                angle = math.atan2(self.ball_pos[1] - bullet[1], self.ball_pos[0] - bullet[0])
-                multiplier = self.powerbullet_multiplier if bullet[4] == "power" else 1
-                self.ball_vel[0] += math.cos(angle) * bullet[3] * self.power_increment * multiplier
-                self.ball_vel[1] += math.sin(angle) * bullet[3] * self.power_increment * multiplier
-                self.bullets.remove(bullet)
-
-    def restart_game(self):
-        self.round_counter = 0
-        self.bullets_used1 = 0
-        self.bullets_used2 = 0
-        self.counter = self.game_time
-        self.player1_score = 0
-        self.player2_score = 0
-        self.reset_ball()
+        pool = self.bullets
+        for i in range(pool.count):
+            color = self.RED if pool.kind[i] == POWER else self.BLACK
+            pygame.draw.circle(self.screen, color, (int(pool.x[i]), int(pool.y[i])), self.BULLET_RADIUS)
+
+    def frame_layers(self):
+        # Everything drawn over the field, in drawing order, for DirtyRenderer
+        layers = []
+        for name, x, img, angle in (("cannon1", 50, self.cannon1_img, self.angle1),
+                                    ("cannon2", self.WIDTH - 50, self.cannon2_img, self.angle2)):
+            rotated_img, img_rect = self.cannon_sprite(x, self.HEIGHT // 2, img, angle)
+            layers.append((name, angle, img_rect,
+                           lambda surface=rotated_img, rect=img_rect: self.screen.blit(surface, rect)))
+
+        radius = self.BALL_RADIUS
+        ball_rect = pygame.Rect(int(self.ball_pos[0]) - radius - 1, int(self.ball_pos[1]) - radius - 1,
+                                2 * radius + 3, 2 * radius + 3)
+        layers.append(("ball", tuple(self.ball_pos), ball_rect, self.draw_ball))
+
+        pool = self.bullets
+        radius = self.BULLET_RADIUS
+        for i in range(pool.count):
+            color = self.RED if pool.kind[i] == POWER else self.BLACK
+            center = (int(pool.x[i]), int(pool.y[i]))
+            bullet_rect = pygame.Rect(center[0] - radius - 1, center[1] - radius - 1, 2 * radius + 3, 2 * radius + 3)
+            layers.append((("bullet", i), color, bullet_rect,
+                           lambda color=color, center=center: pygame.draw.circle(self.screen, color, center, radius)))
+
+        for name, x, power, color in (("power1", 50, self.cannon1_power, self.RED),
+                                      ("power2", self.WIDTH - 50, self.cannon2_power, self.BLUE)):
+            layers.append((name, power, pygame.Rect(x - 25, self.HEIGHT // 2 + 40, 50, 10),
+                           lambda x=x, power=power, color=color: self.draw_power_bar(x, self.HEIGHT // 2,
+                                                                                      power, color)))
+
+        if self.win_estimate is not None:
+            layers.append(("win_bar", (self.win_estimate["win"], self.win_estimate["draw"]), self.win_bar_rect(),
+                           self.draw_win_bar))
+
+        for slot, surface, position in self.hud_texts():
+            layers.append((slot, surface, surface.get_rect(topleft=position),
+                           lambda surface=surface, position=position: self.screen.blit(surface, position)))
+        return layers
+
+    def draw_frame(self):
+        self.draw_field()
+        self.cannon1_angle = self.draw_cannon(50, self.HEIGHT // 2, self.cannon1_img, self.angle1)
+        self.cannon2_angle = self.draw_cannon(self.WIDTH - 50, self.HEIGHT // 2, self.cannon2_img, self.angle2)
+        self.draw_ball()
+        self.draw_bullets()
+        self.draw_power_bar(50, self.HEIGHT // 2, self.cannon1_power, self.RED)
+        self.draw_power_bar(self.WIDTH - 50, self.HEIGHT // 2, self.cannon2_power, self.BLUE)
+        if self.win_estimate is not None:
+            self.draw_win_bar()
+        
+        # Draw UI elements
+        self.draw_ui()
+
+    def update_win_probability(self):
+        if self.win_executor is None:
+            return
+        if self.win_future is not None:
+            if not self.win_future.done():
+                return
+            try:
+                self.win_estimate = self.win_future.result()
+            except Exception as e:
+                print(f"Error estimating win probability, turning it off: {e}")
+                self.win_executor.shutdown(wait=False, cancel_futures=True)
+                self.win_executor = None
+                return
+            finally:
+                self.win_future = None
+        now = pygame.time.get_ticks()
+        if not self.game_over and now - self.win_started >= 1000:
+            # Scripts in worker processes cannot be sent along, their team names can
+            bots = [name if hasattr(script, "close") else script
+                    for name, script in zip(self.team_names, (self.player_script_left, self.player_script_right))]
+            self.win_future = self.win_executor.submit(estimate, self.snapshot(), *bots, WIN_ROLLOUTS, self.ticks,
+                                                       time_limit=WIN_TIME_LIMIT)
+            self.win_started = now
+
+    def draw_win_bar(self):
+        # Left win, draw and right win probabilities as one bar under the score
+        x, y, width, height = self.win_bar_rect()
+        win, draw = self.win_estimate["win"], self.win_estimate["draw"]
+        pygame.draw.rect(self.screen, self.BLUE, (x, y, width, height))
+        pygame.draw.rect(self.screen, self.GRAY, (x, y, int(width * (win + draw)), height))
+        pygame.draw.rect(self.screen, self.RED, (x, y, int(width * win), height))
+
+    def win_bar_rect(self):
+        return pygame.Rect(self.WIDTH // 2 - 150, 38, 300, 8)
 
     def draw_game_over_screen(self):
         # Implement game over screen drawing logic here
@@ -434,181 +460,162 @@ class FootballGame:
                     if self.handle_game_over_events(event, restart_button):
                         self.game_over = False
                         self.restart_game()
+                        if self.dirty_renderer is not None:
+                            self.dirty_renderer.invalidate()
                 
                 pygame.display.flip()
                 self.clock.tick(self.FPS)
                 continue
 
-            self.draw_field()
-            self.cannon1_angle = self.draw_cannon(50, self.HEIGHT // 2, self.cannon1_img, self.angle1)
-            self.cannon2_angle = self.draw_cannon(self.WIDTH - 50, self.HEIGHT // 2, self.cannon2_img, self.angle2)
-            self.draw_ball()
-            self.draw_bullets()
-            self.draw_power_bar(50, self.HEIGHT // 2, self.cannon1_power, self.RED)
-            self.draw_power_bar(self.WIDTH - 50, self.HEIGHT // 2, self.cannon2_power, self.BLUE)
-
-            current_time = pygame.time.get_ticks()
-            
-            # Handle player turns and script execution
-            self.handle_player_turns(current_time)
-            
-            # Handle events and update game state
+            # Handle window events
             self.handle_events()
             
-            # Update game elements
-            self.update_ball()
-            self.handle_bullets()
+            # Advance player turns, rules and physics by speed ticks; the
+            # ticks are the same as at normal speed, only more per frame
+            self.run_until(self.ticks + self.speed)
+            if self.game_over and self.latency_report is not None:
+                self.latency.write(self.latency_report)
+            self.update_win_probability()
             
-            # Draw UI elements
-            self.draw_ui()
-            
-            pygame.display.flip()
+            # Draw one frame in render_every, and always the last one
+            self.frame += 1
+            if self.frame % self.render_every == 0 or self.game_over:
+                if self.dirty_renderer is not None:
+                    # Redraw and push only what changed
+                    self.dirty_renderer.render(self.frame_layers())
+                else:
+                    self.draw_frame()
+                    pygame.display.flip()
             self.clock.tick(self.FPS)
 
+        self.close_scripts()
         pygame.quit()
 
-    def handle_player_turns(self, current_time):
-        # Update player readiness
-        self.player1_ready = current_time - self.last_shot_time1 >= self.turn_delay * 1000
-        self.player2_ready = current_time - self.last_shot_time2 >= self.turn_delay * 1000
+    def request_decision(self, player):
+        if self.decision_executor is None:
+            return super().request_decision(player)
+        # Asynchronous decisions are timed where the script runs, see decide()
+        return self.decide(player)
+
+    def decide(self, player):
+        if self.decision_executor is None:
+            return super().decide(player)
+        
+        future = self.pending_decisions[player - 1]
+        if future is None:
+            # Hand the script a copy of the state, the engine keeps changing it
+            script, (cannon_pos, ball_pos, power_count, precision_count, ball_vel) = self.script_call(player)
+            self.pending_decisions[player - 1] = self.decision_executor.submit(
+                timed_call, script, cannon_pos, list(ball_pos), power_count, precision_count, list(ball_vel))
+            return None
+        if not future.done():
+            return None
+        
+        self.pending_decisions[player - 1] = None
+        try:
+            command, seconds = future.result()
+        except Exception as e:
+            print(f"Error in player {player} script: {e}")
+            return None
+        if self.latency is not None:
+            self.latency.record(self.team_names[player - 1], seconds)
+        return command
+
+    def restart_game(self):
+        # Play the new match with the latest working version of each team;
+        # worker processes keep the version they imported at start
+        if self.registry is not None:
+            for side, team_name in enumerate(self.team_names):
+                script = (self.player_script_left, self.player_script_right)[side]
+                if hasattr(script, "close"):
+                    continue
+                try:
+                    script = self.registry.script(team_name)
+                except LookupError as e:
+                    print(f"{e}, keeping the current version")
+                    continue
+                if side == 0:
+                    self.player_script_left = script
+                else:
+                    self.player_script_right = script
+        super().restart_game()
+        self.win_estimate = None
+
+    def reset_ball(self):
+        super().reset_ball()
+        # Decisions still being computed belong to the previous round
+        self.pending_decisions = [None, None]
+
+    def close_scripts(self):
+        if self.registry is not None:
+            self.registry.stop()
         
-        # Handle player 1 execution
-        if self.player1_executing is not None:
-            self.execute_player1_shot()
-        elif self.player1_ready:
-            self.handle_player1_command()
-            
-        # Handle player 2 execution
-        if self.player2_executing is not None:
-            self.execute_player2_shot()
-        elif self.player2_ready:
-            self.handle_player2_command()
-
-    def execute_player1_shot(self):
-        if self.cannon1_power < self.player1_executing[1] and self.cannon1_power < self.MAX_POWER:
-            self.cannon1_power += 1
-        else:
-            angle = self.player1_executing[0]
-            if self.player1_executing[2] == "power":
-                angle += random.uniform(-self.powerbullet_angle_error, self.powerbullet_angle_error)
-            self.bullets.append([50, self.HEIGHT // 2, angle, self.cannon1_power, self.player1_executing[2]])
-            self.last_shot_time1 = pygame.time.get_ticks()
-            self.cannon1_power = 0
-            self.player1_executing = None
-
-    def handle_player1_command(self):
-        player1_command = self.player_script_left(self.cannon1_pos, self.ball_pos, 
-                                                self.powerbullets1, self.precisionbullets1, 
-                                                self.ball_vel)
-        if player1_command is not None:
-            angle, power, bullet_type = player1_command
-            self.angle1 = angle
-            if self.process_player_shot(1, angle, power, bullet_type):
-                self.player1_ready = False
-
-    def execute_player2_shot(self):
-        if self.cannon2_power < self.player2_executing[1] and self.cannon2_power < self.MAX_POWER:
-            self.cannon2_power += 1
-        else:
-            self.bullets.append([self.WIDTH - 50, self.HEIGHT // 2, 
-                               self.player2_executing[0], self.cannon2_power, 
-                               self.player2_executing[2]])
-            self.last_shot_time2 = pygame.time.get_ticks()
-            self.cannon2_power = 0
-            self.player2_executing = None
-
-    def handle_player2_command(self):
-        player2_command = self.player_script_right(self.cannon2_pos, self.ball_pos,
-                                                 self.powerbullets2, self.precisionbullets2,
-                                                 self.ball_vel)
-        if player2_command is not None:
-            angle, power, bullet_type = player2_command
-            self.angle2 = angle
-            if self.process_player_shot(2, angle, power, bullet_type):
-                self.player2_ready = False
-
-    def process_player_shot(self, player, angle, power, bullet_type):
-        if player == 1:
-            if bullet_type == "power" and self.powerbullets1 > 0:
-                self.player1_executing = (angle, power, bullet_type)
-                self.powerbullets1 -= 1
-                self.bullets_used1 += 1
-                return True
-            elif bullet_type == "precision" and self.precisionbullets1 > 0:
-                self.player1_executing = (angle, power, bullet_type)
-                self.precisionbullets1 -= 1
-                self.bullets_used1 += 1
-                return True
-        else:
-            if bullet_type == "power" and self.powerbullets2 > 0:
-                self.player2_executing = (angle, power, bullet_type)
-                self.powerbullets2 -= 1
-                self.bullets_used2 += 1
-                return True
-            elif bullet_type == "precision" and self.precisionbullets2 > 0:
-                self.player2_executing = (angle, power, bullet_type)
-                self.precisionbullets2 -= 1
-                self.bullets_used2 += 1
-                return True
-        return False
+        if self.decision_executor is not None:
+            self.decision_executor.shutdown(wait=False, cancel_futures=True)
+        if self.win_executor is not None:
+            self.win_executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Stop worker processes started for out-of-process team scripts
+        for script in (self.player_script_left, self.player_script_right):
+            if hasattr(script, "close"):
+                script.close()
 
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
-
-            if event.type == pygame.USEREVENT:
-                self.counter -= 1
-                if self.counter <= 0:
-                    self.game_over = True
-
-        # Check for game-ending conditions
-        if self.player1_score >= self.winning_score or self.player2_score >= self.winning_score:
-            self.game_over = True
-
-        # Check if ball is not moving and both players are out of bullets
-        if (self.ball_vel[0] == 0 and self.ball_vel[1] == 0 and 
-            self.powerbullets1 == 0 and self.powerbullets2 == 0 and 
-            self.precisionbullets1 == 0 and self.precisionbullets2 == 0):
-            if abs(self.ball_pos[0] - self.cannon1_pos[0]) > abs(self.ball_pos[0] - self.cannon2_pos[0]):
-                self.player1_score += 1
-            else:
-                self.player2_score += 1
-            self.reset_ball()
+            elif event.type == pygame.KEYDOWN:
+                # Fast-forward: ] doubles the speed, [ halves it
+                if event.key == pygame.K_RIGHTBRACKET:
+                    self.speed = min(self.speed * 2, self.MAX_SPEED)
+                elif event.key == pygame.K_LEFTBRACKET:
+                    self.speed = max(self.speed // 2, 1)
 
     def draw_ui(self):
-        # Draw scores
-        score_text = self.font.render(
-            f"Player 1: {self.player1_score}  Player 2: {self.player2_score}", 
-            True, self.BLACK
-        )
-        self.screen.blit(score_text, (self.WIDTH // 2 - score_text.get_width() // 2, 10))
-        
-        # Draw timer
-        timer_text = self.font.render(f"Time: {self.counter}", True, self.BLACK)
-        self.screen.blit(timer_text, (self.WIDTH // 2 - 50, 100))
-        
-        # Draw bullet counts for Player 1
-        power_text1 = self.font_bulletcount.render(f"Power Bullets: {self.powerbullets1}", True, self.BLACK)
-        precision_text1 = self.font_bulletcount.render(f"Precision Bullets: {self.precisionbullets1}", True, self.BLACK)
-        
-        self.screen.blit(power_text1, (10, self.HEIGHT - power_text1.get_height() - 10))
-        self.screen.blit(precision_text1, (10, self.HEIGHT - power_text1.get_height() - 
-                                         precision_text1.get_height() - 20))
-        
-        # Draw bullet counts for Player 2
-        power_text2 = self.font_bulletcount.render(f"Power Bullets: {self.powerbullets2}", True, self.BLACK)
-        precision_text2 = self.font_bulletcount.render(f"Precision Bullets: {self.precisionbullets2}", True, self.BLACK)
-        
-        self.screen.blit(power_text2, (self.WIDTH - power_text2.get_width() - 10, 
-                                     self.HEIGHT - power_text2.get_height() - 10))
-        self.screen.blit(precision_text2, (self.WIDTH - precision_text2.get_width() - 10,
-                                         self.HEIGHT - power_text2.get_height() - 
-                                         precision_text2.get_height() - 20))
-        
-        # Draw FPS counter
-        fps_text = self.font.render(f"FPS: {int(self.clock.get_fps())}", True, self.WHITE)
-        self.screen.blit(fps_text, (10, 10))
+        for slot, surface, position in self.hud_texts():
+            self.screen.blit(surface, position)
+
+    def hud_texts(self):
+        # (slot, surface, position) of every HUD text. Surfaces come from the
+        # render cache and are only re-rendered when their string changes.
+        text = self.render_cache.text
+        
+        # Scores
+        score_text = text("score", self.font,
+                          f"Player 1: {self.player1_score}  Player 2: {self.player2_score}", self.BLACK)
+        
+        # Timer
+        timer_text = text("timer", self.font, f"Time: {self.counter}", self.BLACK)
+        
+        # Bullet counts for Player 1
+        power_text1 = text("power1", self.font_bulletcount, f"Power Bullets: {self.powerbullets1}", self.BLACK)
+        precision_text1 = text("precision1", self.font_bulletcount,
+                               f"Precision Bullets: {self.precisionbullets1}", self.BLACK)
+        
+        # Bullet counts for Player 2
+        power_text2 = text("power2", self.font_bulletcount, f"Power Bullets: {self.powerbullets2}", self.BLACK)
+        precision_text2 = text("precision2", self.font_bulletcount,
+                               f"Precision Bullets: {self.precisionbullets2}", self.BLACK)
+        
+        # FPS counter, with the turbo speed when fast-forwarding
+        fps = f"FPS: {int(self.clock.get_fps())}"
+        if self.speed > 1:
+            fps += f"  x{self.speed}"
+        fps_text = text("fps", self.font, fps, self.WHITE)
+        
+        return [
+            ("score_text", score_text, (self.WIDTH // 2 - score_text.get_width() // 2, 10)),
+            ("timer_text", timer_text, (self.WIDTH // 2 - 50, 100)),
+            ("power_text1", power_text1, (10, self.HEIGHT - power_text1.get_height() - 10)),
+            ("precision_text1", precision_text1,
+             (10, self.HEIGHT - power_text1.get_height() - precision_text1.get_height() - 20)),
+            ("power_text2", power_text2,
+             (self.WIDTH - power_text2.get_width() - 10, self.HEIGHT - power_text2.get_height() - 10)),
+            ("precision_text2", precision_text2,
+             (self.WIDTH - precision_text2.get_width() - 10,
+              self.HEIGHT - power_text2.get_height() - precision_text2.get_height() - 20)),
+            ("fps_text", fps_text, (10, 10)),
+        ]
 
     def draw_game_over_screen(self):
         # Modern color palette
@@ -617,30 +624,19 @@ class FootballGame:
         WHITE = (255, 255, 255)
         GRAY = (130, 130, 130)
         
-        # Create background with subtle gradient
-        background = pygame.Surface((self.WIDTH, self.HEIGHT))
-        for y in range(self.HEIGHT):
-            alpha = y / self.HEIGHT
-            color = [int(BG_COLOR[i] + (PRIMARY[i] - BG_COLOR[i]) * alpha * 0.15) for i in range(3)]
-            pygame.draw.line(background, tuple(color), (0, y), (self.WIDTH, y))
-        self.screen.blit(background, (0, 0))
+        # Background with subtle gradient, built once per resolution
+        self.screen.blit(self.assets.gradient((self.WIDTH, self.HEIGHT), BG_COLOR, PRIMARY), (0, 0))
         
         # Determine winner
-        if self.player1_score > self.player2_score:
-            winner = 1
-        elif self.player2_score > self.player1_score:
-            winner = 2
-        else:
-            winner = 1 if self.bullets_used1 < self.bullets_used2 else 2
+        winner = self.winner() or 2
             
         # Draw score cards
         self.draw_score_card(1, self.player1_score, self.bullets_used1, self.WIDTH//4 - 140, self.HEIGHT//3)
         self.draw_score_card(2, self.player2_score, self.bullets_used2, self.WIDTH*3//4 - 140, self.HEIGHT//3)
         
         # Draw winner announcement
-        winner_font = pygame.font.Font(None, 84)
         winner_text = f"PLAYER {winner} WINS!"
-        winner_surface = winner_font.render(winner_text, True, WHITE)
+        winner_surface = self.render_cache.text("winner", self.assets.font(84), winner_text, WHITE)
         winner_rect = winner_surface.get_rect(center=(self.WIDTH//2, self.HEIGHT//4))
         self.screen.blit(winner_surface, winner_rect)
         
@@ -653,13 +649,23 @@ class FootballGame:
         
         # Draw button
         pygame.draw.rect(self.screen, PRIMARY, button_rect, border_radius=15)
-        button_text = self.font.render("PLAY AGAIN", True, WHITE)
+        button_text = self.render_cache.text("play_again", self.font, "PLAY AGAIN", WHITE)
         text_rect = button_text.get_rect(center=button_rect.center)
         self.screen.blit(button_text, text_rect)
         
         return button_rect
 
     def draw_score_card(self, player_num, score, bullets, x, y):
+        # The card is only rebuilt when its numbers change
+        card_surface = self.render_cache.surface(("score_card", player_num), (score, bullets),
+                                                 lambda: self.build_score_card(player_num, score, bullets))
+        
+        # Apply floating animation
+        current_time = pygame.time.get_ticks()
+        y_offset = math.sin(current_time / 1000 * 2 + (player_num * math.pi)) * 5
+        self.screen.blit(card_surface, (x, y + y_offset))
+
+    def build_score_card(self, player_num, score, bullets):
         PRIMARY = (86, 63, 251)
         WHITE = (255, 255, 255)
         GRAY = (130, 130, 130)
@@ -672,29 +678,46 @@ class FootballGame:
         pygame.draw.rect(card_surface, (*PRIMARY, 40), (0, 0, card_width, card_height), border_radius=15)
         
         # Player text
-        player_font = pygame.font.Font(None, 36)
+        player_font = self.assets.font(36)
         player_text = player_font.render(f"PLAYER {player_num}", True, WHITE)
         card_surface.blit(player_text, (20, 20))
         
         # Score
-        score_font = pygame.font.Font(None, 72)
+        score_font = self.assets.font(72)
         score_text = score_font.render(str(score), True, WHITE)
         card_surface.blit(score_text, (20, 50))
         
         # Bullets used
-        bullets_font = pygame.font.Font(None, 28)
+        bullets_font = self.assets.font(28)
         bullets_text = bullets_font.render(f"Bullets: {bullets}", True, GRAY)
         card_surface.blit(bullets_text, (20, 110))
         
-        # Apply floating animation
-        current_time = pygame.time.get_ticks()
-        y_offset = math.sin(current_time / 1000 * 2 + (player_num * math.pi)) * 5
-        self.screen.blit(card_surface, (x, y + y_offset))
+        return card_surface
 
 # Example usage
 def main():
+    parser = argparse.ArgumentParser(description="Turn-based football game between two team scripts.")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="seconds per decision; runs each team script in its own worker process")
+    parser.add_argument("--async-decisions", choices=["thread", "process"], default=None,
+                        help="compute decisions in a pool without blocking the game loop")
+    parser.add_argument("--latency-report", default=None,
+                        help="write per-team decision latencies to this .json or .csv file at match end")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw and update only the changed parts of the screen each frame")
+    parser.add_argument("--rotation-step", type=float, default=ROTATION_STEP,
+                        help="degrees between cached cannon rotations (0 for exact angles)")
+    parser.add_argument("--speed", type=int, default=1,
+                        help="engine ticks per displayed frame, e.g. 8 or 32 to watch a match fast-forwarded")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="draw only every k-th frame, leaving the time of the others to the engine")
+    parser.add_argument("--win-probability", action="store_true",
+                        help="show a live win-probability bar, estimated by rollouts in a worker process")
+    args = parser.parse_args()
+
     try:
-        game = FootballGame()
+        game = FootballGame(args.budget, args.async_decisions, args.latency_report, args.dirty_rects,
+                            args.rotation_step, args.speed, args.render_every, args.win_probability)
         game.run()
     except SystemExit as e:
         print(e)
@@ -0,0 +1,36 @@
+import bisect
+
+# Below this speed a ball axis stops dead, see MatchEngine.update_ball()
+STOP_SPEED = 0.1
+
+# Ticks covered by the friction tables; a ball launched at any playable
+# speed stops long before this
+TABLE_TICKS = 4096
+
+_tables = {}
+
+
+def friction_tables(friction):
+    """Per-tick friction factors after k ticks and their running sums.
+
+    powers[k] is the velocity factor k ticks after a launch and sums[k] the
+    distance factor, so a launch at v from p is at p + v * sums[k] moving at
+    v * powers[k]. Both are built once by repeated multiplication and shared
+    by every engine, which keeps tick-by-tick and jumping engines identical.
+    """
+    tables = _tables.get(friction)
+    if tables is None:
+        powers = [1.0]
+        sums = [0.0]
+        for _ in range(TABLE_TICKS):
+            sums.append(sums[-1] + powers[-1])
+            powers.append(powers[-1] * friction)
+        tables = _tables[friction] = (powers, sums)
+    return tables
+
+
+def stop_age(speed, powers):
+    # First tick (from 1) at which an axis launched at speed is below STOP_SPEED
+    speed = abs(speed)
+    return bisect.bisect_left(range(1, len(powers)), True, key=lambda k: speed * powers[k] < STOP_SPEED) + 1
+
@@ -0,0 +1,110 @@
+import csv
+import json
+import math
+import time
+from array import array
+
+# Samples kept per team; percentiles are taken over this most recent window
+RING_CAPACITY = 4096
+
+REPORT_FIELDS = ("team", "calls", "mean_ms", "p50_ms", "p99_ms", "max_ms")
+
+
+def timed_call(script, *args):
+    # (result, seconds) of one call, for decisions made in another thread or
+    # process where timing the hand-off would say nothing about the script
+    start = time.perf_counter()
+    result = script(*args)
+    return result, time.perf_counter() - start
+
+
+class TeamLatency:
+    __slots__ = ("samples", "index", "calls", "total", "max")
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.samples = array("d", bytes(8 * capacity))
+        self.index = 0
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def recent(self):
+        # Samples still in the ring, oldest first
+        if self.calls < len(self.samples):
+            return self.samples[:self.calls]
+        return self.samples[self.index:] + self.samples[:self.index]
+
+    def merge(self, other):
+        calls, total, peak = self.calls + other.calls, self.total + other.total, max(self.max, other.max)
+        for seconds in other.recent():
+            self.record(seconds)
+        self.calls, self.total, self.max = calls, total, peak
+
+    def percentile(self, q):
+        samples = sorted(self.recent())
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))]
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "mean_ms": 1000 * self.total / self.calls if self.calls else 0.0,
+            "p50_ms": 1000 * self.percentile(50),
+            "p99_ms": 1000 * self.percentile(99),
+            "max_ms": 1000 * self.max,
+        }
+
+    def __getstate__(self):
+        # Only ship the filled part of the ring between processes
+        return (self.recent(), self.calls, self.total, self.max, len(self.samples))
+
+    def __setstate__(self, state):
+        recent, calls, total, peak, capacity = state
+        self.__init__(capacity)
+        for seconds in recent:
+            self.record(seconds)
+        self.calls, self.total, self.max = calls, total, peak
+
+
+class LatencyRecorder:
+    """Decision latency per team, timed around every player_script call."""
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.teams = {}
+
+    def record(self, team, seconds):
+        latency = self.teams.get(team)
+        if latency is None:
+            latency = self.teams[team] = TeamLatency(self.capacity)
+        latency.record(seconds)
+
+    def merge(self, other):
+        for team, latency in other.teams.items():
+            if team not in self.teams:
+                self.teams[team] = TeamLatency(self.capacity)
+            self.teams[team].merge(latency)
+
+    def report(self):
+        return {team: latency.summary() for team, latency in sorted(self.teams.items())}
+
+    def write(self, path):
+        # CSV for a .csv path, JSON otherwise
+        report = self.report()
+        with open(path, "w", newline="") as f:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                for team, summary in report.items():
+                    writer.writerow({"team": team, **summary})
+            else:
+                json.dump(report, f, indent=2)
@@ -2,20 +2,12 @@ import pygame
 import math
 import random
 
+from assets import Assets
+from render import SpriteCache
+
 # Initialize pygame
 pygame.init()
 
-# Load cannon sprites
-cannon1_img = pygame.image.load("cannon.png")
-cannon2_img = pygame.image.load("cannon.png")
-ball_img = pygame.image.load("ball.png")
-
-# Scale cannon sprites (if necessary)
-cannon1_img = pygame.transform.scale(cannon1_img, (60, 20))  # Adjust size as needed
-cannon2_img = pygame.transform.scale(cannon2_img, (60, 20))  # Adjust size as needed
-cannon2_img = pygame.transform.flip(cannon2_img, False, True)  # Flip the cannon sprite
-ball_img = pygame.transform.scale(ball_img, (40, 40))  # Adjust size as needed
-
 
 # Screen settings
 WIDTH, HEIGHT = 800, 600
@@ -76,9 +68,21 @@ winning_score = 5
 # Turn
 current_turn = 1  # 1 for Player 1, 2 for Player 2
 
+# Load sprites once the display format is known
+assets = Assets()
+images = [("cannon.png", (60, 20)), ("cannon.png", (60, 20), (False, True)),
+          ("ball.png", (2 * BALL_RADIUS, 2 * BALL_RADIUS))]
+print(f"Loaded {len(images)} images in {1000 * assets.preload(images):.1f} ms")
+cannon1_img = assets.image("cannon.png", (60, 20))  # Adjust size as needed
+cannon2_img = assets.image("cannon.png", (60, 20), (False, True))  # Flipped for the right side
+ball_img = assets.image("ball.png", (2 * BALL_RADIUS, 2 * BALL_RADIUS))
+
+# Rotated cannons, built once per angle
+sprites = SpriteCache()
+
 # Font
-font = pygame.font.Font(None, 36)
-font_bulletcount = pygame.font.Font(None, 24)
+font = assets.font(36)
+font_bulletcount = assets.font(24)
 
 def draw_field():
     # Green background for the field
@@ -106,7 +110,7 @@ def draw_cannon(x, y, img):
     angle = math.degrees(math.atan2(y - mouse_y, mouse_x - x))
     
     # Rotate the cannon sprite
-    rotated_img = pygame.transform.rotate(img, angle)
+    rotated_img = sprites.rotated(img, angle)
     img_rect = rotated_img.get_rect(center=(x, y))
     
     # Draw the cannon
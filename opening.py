@@ -0,0 +1,213 @@
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import trajectory
+from bullets import BULLET_TYPES
+from engine import WIDTH, MatchEngine
+from replay import BULLET_TYPE_NAMES, Replay
+
+# Kickoff spots and the jitter MatchEngine.reset_ball() adds to each coordinate
+_rules = MatchEngine(None, None)
+POSITIONS = _rules.positions
+JITTER = 5
+SPAN = 2 * JITTER + 1
+
+# File layout: header, then one fixed-size entry per side, spot and jitter
+BOOK_MAGIC = b"AGOB"
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct("<4sBBBB")  # magic, version, spots, jitter, shots per entry
+BOOK_SHOTS = 3
+ENTRY = struct.Struct("<H")  # ticks from the first decision until the goal, NO_GOAL if none
+SHOT = struct.Struct("<BBddd")  # bullet type (0 ends the sequence), power, angle, ball x, y when taken
+ENTRY_SIZE = ENTRY.size + BOOK_SHOTS * SHOT.size
+NO_GOAL = 0xFFFF
+BOOK_PATH = "opening.book"
+
+# Candidate shots: aim points behind the opponent's goal line, and a kick
+# just strong enough to get there or as strong as possible
+TARGET_YS = (100, 200, 250, 300, 350, 400, 500)
+GOAL_MARGIN = 100
+KICK_SPEEDS = (None, 10)
+
+
+def entry_index(side, spot, dx, dy):
+    return ((side * len(POSITIONS) + spot) * SPAN + dx + JITTER) * SPAN + dy + JITTER
+
+
+def kickoff(ball_pos):
+    # Spot and jitter of a ball resting where reset_ball() can put it, or None
+    for spot, (x, y) in enumerate(POSITIONS):
+        dx, dy = ball_pos[0] - x, ball_pos[1] - y
+        if dx == int(dx) and dy == int(dy) and abs(dx) <= JITTER and abs(dy) <= JITTER:
+            return spot, int(dx), int(dy)
+    return None
+
+
+def kickoff_engine(ball_pos, decisions):
+    # Engine at a kickoff with the ball at ball_pos, playing decisions only
+    engine = Replay(0, decisions).engine()
+    engine.ball_pos[:] = ball_pos
+    engine.launch_ball([0, 0])
+    return engine
+
+
+def goal_ticks(side, engine, command):
+    # Ticks until side scores if it takes command now and the opponent never
+    # shoots, or None; played on a fork so engine can try the next command
+    engine = engine.fork()
+    engine.pending.append((engine.ticks, side + 1, command))
+    result = engine.play()
+    if result["winner"] == side + 1 and result[f"player{side + 1}_score"]:
+        return result["ticks"]
+    return None
+
+
+def candidates(side, ball_pos, ball_vel):
+    cannon_pos = (_rules.cannon1_pos, _rules.cannon2_pos)[side]
+    goal_x = -GOAL_MARGIN if side else WIDTH + GOAL_MARGIN
+    # Power bullets of the left cannon fly off by a random angle, see
+    # MatchEngine.execute_player1_shot()
+    bullet_types = ("precision",) if side == 0 else ("precision", "power")
+    for y, speed, bullet_type in itertools.product(TARGET_YS, KICK_SPEEDS, bullet_types):
+        command = trajectory.shot(cannon_pos, ball_pos, ball_vel, (goal_x, y), bullet_type, speed)
+        if command is not None:
+            yield command
+
+
+def plan_opening(key):
+    # Greedy search for the quickest goal: each shot is the candidate that
+    # scores soonest given the shots before it, and shots are added while
+    # they make the goal come sooner
+    side, spot, dx, dy = key
+    engine = kickoff_engine([POSITIONS[spot][0] + dx, POSITIONS[spot][1] + dy], [])
+    shots = []
+    best = None
+    tick = 0
+    for _ in range(BOOK_SHOTS):
+        engine.run_until(tick)
+        if engine.game_over:
+            break
+        position, velocity = list(engine.ball_pos), list(engine.ball_vel)
+        choice = None
+        for command in candidates(side, position, velocity):
+            ticks = goal_ticks(side, engine, command)
+            if ticks is not None and (choice is None or ticks < choice[0]):
+                choice = (ticks, command)
+        if choice is None or (best is not None and choice[0] >= best):
+            break
+        best, command = choice
+        engine.pending.append((tick, side + 1, command))
+        shots.append((command, position))
+        tick += trajectory.charge_ticks(command[1]) + 1 + trajectory.TURN_DELAY_TICKS
+    return key, best, shots
+
+
+def write_book(path, openings):
+    entries = bytearray(2 * len(POSITIONS) * SPAN * SPAN * ENTRY_SIZE)
+    for (side, spot, dx, dy), ticks, shots in openings:
+        offset = entry_index(side, spot, dx, dy) * ENTRY_SIZE
+        ENTRY.pack_into(entries, offset, NO_GOAL if ticks is None else ticks)
+        for i, ((angle, power, bullet_type), (x, y)) in enumerate(shots):
+            SHOT.pack_into(entries, offset + ENTRY.size + i * SHOT.size, BULLET_TYPES[bullet_type], power, angle, x, y)
+    with open(path, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, len(POSITIONS), JITTER, BOOK_SHOTS))
+        f.write(entries)
+
+
+def build_book(path=BOOK_PATH, workers=None):
+    keys = list(itertools.product((0, 1), range(len(POSITIONS)), range(-JITTER, JITTER + 1),
+                                  range(-JITTER, JITTER + 1)))
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        openings = list(executor.map(plan_opening, keys, chunksize=max(1, len(keys) // (workers * 16))))
+    write_book(path, openings)
+    return openings
+
+
+class OpeningBook:
+    """Opening shots for every kickoff, read from a memory-mapped book file.
+
+    shots(side, ball_pos) finds the entry of a resting ball by arithmetic
+    on its spot and jitter. Each shot carries the ball position it was
+    planned for, so later shots of a sequence are only played while the
+    opponent has not changed the ball's course.
+    """
+
+    def __init__(self, path=BOOK_PATH):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, spots, jitter, shots = BOOK_HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC:
+            raise ValueError("Not an opening book")
+        if (version, spots, jitter, shots) != (BOOK_VERSION, len(POSITIONS), JITTER, BOOK_SHOTS):
+            raise ValueError(f"Unsupported opening book version {version}")
+
+    def shots(self, side, ball_pos):
+        # (goal ticks or None, [(command, ball position)]) of a kickoff, or None
+        key = kickoff(ball_pos)
+        if key is None:
+            return None
+        offset = BOOK_HEADER.size + entry_index(side, *key) * ENTRY_SIZE
+        ticks, = ENTRY.unpack_from(self.data, offset)
+        shots = []
+        for i in range(BOOK_SHOTS):
+            type_code, power, angle, x, y = SHOT.unpack_from(self.data, offset + ENTRY.size + i * SHOT.size)
+            if not type_code:
+                break
+            shots.append(((angle, power, BULLET_TYPE_NAMES[type_code]), (x, y)))
+        return None if ticks == NO_GOAL else ticks, shots
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def book_script(book, fallback):
+    # player_script that plays the book from each kickoff and asks
+    # fallback whenever the book has nothing for the position
+    remaining = {}
+
+    def player_script(cannon_pos, ball_pos, power_bullet_count, precision_bullet_count, ball_vel):
+        side = 0 if cannon_pos[0] < WIDTH / 2 else 1
+        if ball_vel[0] == 0 and ball_vel[1] == 0:
+            entry = book.shots(side, ball_pos)
+            if entry is not None:
+                remaining[side] = list(entry[1])
+        shots = remaining.get(side)
+        if shots and tuple(ball_pos) == shots[0][1]:
+            command = shots.pop(0)[0]
+            counts = {"power": power_bullet_count, "precision": precision_bullet_count}
+            if counts[command[2]] > 0:
+                return command
+        remaining.pop(side, None)
+        return fallback(cannon_pos, ball_pos, power_bullet_count, precision_bullet_count, ball_vel)
+
+    return player_script
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the opening book for every kickoff position.")
+    parser.add_argument("--output", default=BOOK_PATH, help="book file to write")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    openings = build_book(args.output, args.workers)
+    scored = [ticks for key, ticks, shots in openings if ticks is not None]
+    print(f"Wrote {len(openings)} openings to {args.output} in {time.perf_counter() - start:.1f} s; "
+          f"{len(scored)} score, in {sum(scored) / max(1, len(scored)):.0f} ticks on average")
+
+
+if __name__ == "__main__":
+    main()
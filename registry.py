@@ -0,0 +1,178 @@
+import os
+import importlib
+import sys
+import threading
+import types
+
+from engine import RANDOM_LOCK
+
+TEAMS_DIR = "teams"
+
+# Seconds between scans of the teams directory by TeamRegistry.start()
+SCAN_INTERVAL = 1.0
+
+
+def find_teams(teams_dir=TEAMS_DIR):
+    teams = []
+
+    if not os.path.exists(teams_dir):
+        print(f"Warning: {teams_dir} directory not found")
+        return teams
+
+    for file in os.listdir(teams_dir):
+        if file.endswith(".py") and not file.startswith("__"):
+            team_name = file[:-3]  # Remove .py extension
+            teams.append(team_name)
+
+    return sorted(teams)
+
+
+def load_player_script(team_name, teams_dir=TEAMS_DIR):
+    module = importlib.import_module(f"{teams_dir}.{team_name}")
+    return module.player_script
+
+
+# Scripts compiled by TeamScript in this process, per file and source
+_compiled = {}
+
+
+def exec_team_file(module_name, path, source):
+    # player_script of source, executed as a new module object
+    module = types.ModuleType(module_name)
+    module.__file__ = path
+    code = compile(source, path, "exec")
+    # Not while a match thread has random pointed at a player's stream
+    with RANDOM_LOCK:
+        exec(code, module.__dict__)
+    return module, module.player_script
+
+
+class TeamScript:
+    """One version of a team's player_script that other processes can run.
+
+    Calling it calls the script. It pickles as the module name, path and
+    source it was loaded from rather than by reference, so a worker process
+    compiles exactly this version (once) even after a reload has replaced
+    the module in sys.modules or the file has changed again.
+    """
+
+    def __init__(self, module_name, path, source, function=None):
+        self.module_name = module_name
+        self.path = path
+        self.source = source
+        self.function = function
+
+    def __call__(self, *args):
+        if self.function is None:
+            key = (self.path, self.source)
+            self.function = _compiled.get(key)
+            if self.function is None:
+                self.function = _compiled[key] = exec_team_file(self.module_name, self.path, self.source)[1]
+        return self.function(*args)
+
+    def __getstate__(self):
+        return self.module_name, self.path, self.source
+
+    def __setstate__(self, state):
+        self.module_name, self.path, self.source = state
+        self.function = None
+
+
+class TeamRegistry:
+    """Team scripts of teams_dir, reloaded whenever their files change.
+
+    scan() compares file mtimes with the last scan, executes new and changed
+    files as fresh modules and forgets removed ones. Scripts are TeamScripts,
+    so a match can send the version it plays to worker processes. A team whose file fails
+    to load keeps its last working script, so a half-saved edit never takes
+    a team out of the game. start() runs scan() in a background thread;
+team code never runs there while a match is calling a script.
+    """
+
+    def __init__(self, teams_dir=TEAMS_DIR):
+        self.teams_dir = teams_dir
+        self.mtimes = {}
+        self.scripts = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.scan()
+
+    def scan(self):
+        # Load new and changed team files; returns the names (re)loaded
+        if not os.path.exists(self.teams_dir):
+            print(f"Warning: {self.teams_dir} directory not found")
+            return []
+
+        found = {}
+        for team_name in find_teams(self.teams_dir):
+            try:
+                found[team_name] = os.stat(self.path(team_name)).st_mtime_ns
+            except OSError:
+                continue  # Removed since listing
+
+        loaded = []
+        for team_name, mtime in found.items():
+            if self.mtimes.get(team_name) == mtime:
+                continue
+            self.mtimes[team_name] = mtime
+            try:
+                script = self.load(team_name)
+            except Exception as e:
+                if team_name in self.scripts:
+                    print(f"Error reloading team {team_name}, keeping the last working version: {e}")
+                else:
+                    print(f"Error loading team {team_name}: {e}")
+                continue
+            with self.lock:
+                self.scripts[team_name] = script
+            loaded.append(team_name)
+
+        for team_name in set(self.mtimes) - set(found):
+            del self.mtimes[team_name]
+            with self.lock:
+                self.scripts.pop(team_name, None)
+        return loaded
+
+    def path(self, team_name):
+        return os.path.join(self.teams_dir, f"{team_name}.py")
+
+    def load(self, team_name):
+        # Execute the file as a new module object, so a failed reload leaves
+        # the working version and its globals untouched. The source is
+        # compiled directly: cached bytecode is only checked to the second.
+        path = self.path(team_name)
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        module, function = exec_team_file(f"{self.teams_dir}.{team_name}", path, source)
+        sys.modules[module.__name__] = module
+        return TeamScript(module.__name__, path, source, function)
+
+    def teams(self):
+        # Names of the teams with a working script
+        with self.lock:
+            return sorted(self.scripts)
+
+    def script(self, team_name):
+        # Latest working script of a team
+        with self.lock:
+            script = self.scripts.get(team_name)
+        if script is None:
+            raise LookupError(f"Team {team_name} has no working script in {self.teams_dir}")
+        return script
+
+    def start(self, interval=SCAN_INTERVAL):
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.watch, args=(interval,), daemon=True)
+            self.thread.start()
+
+    def watch(self, interval):
+        while not self.stopped.wait(interval):
+            self.scan()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
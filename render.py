@@ -0,0 +1,140 @@
+from collections import OrderedDict
+
+import pygame
+
+# Rotated sprites are cached per multiple of this many degrees
+ROTATION_STEP = 1
+
+# Rotated sprites kept before the least recently used are dropped
+SPRITE_CACHE_SIZE = 512
+
+# Colors of the pitch
+FIELD_COLOR = (34, 139, 34)
+LINE_COLOR = (255, 255, 255)
+
+
+def paint_field(surface, width, height):
+    # Pitch and markings of a width x height field
+    surface.fill(FIELD_COLOR)
+    pygame.draw.rect(surface, LINE_COLOR, (50, 50, width - 100, height - 100), 5)
+    pygame.draw.line(surface, LINE_COLOR, (width // 2, 50), (width // 2, height - 50), 5)
+    pygame.draw.circle(surface, LINE_COLOR, (width // 2, height // 2), 70, 5)
+    pygame.draw.rect(surface, LINE_COLOR, (50, height // 2 - 75, 50, 150), 5)
+    pygame.draw.rect(surface, LINE_COLOR, (width - 100, height // 2 - 75, 50, 150), 5)
+
+
+class RenderCache:
+    """Surfaces that are only redrawn when what they show changes.
+
+    Backgrounds are painted once per name and size. Each slot (the score,
+    the timer, a score card...) keeps its last surface together with the key
+    it was built from, and is built again only when that key changes.
+    """
+
+    def __init__(self):
+        self.backgrounds = {}
+        self.surfaces = {}
+
+    def background(self, name, size, paint):
+        surface = self.backgrounds.get((name, size))
+        if surface is None:
+            surface = pygame.Surface(size)
+            # Match the display's pixel format so blitting it is a plain copy
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            paint(surface)
+            self.backgrounds[(name, size)] = surface
+        return surface
+
+    def surface(self, slot, key, build):
+        cached = self.surfaces.get(slot)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        surface = build()
+        self.surfaces[slot] = (key, surface)
+        return surface
+
+    def text(self, slot, font, text, color):
+        return self.surface(slot, (font, text, color), lambda: font.render(text, True, color))
+
+    def clear(self):
+        self.backgrounds.clear()
+        self.surfaces.clear()
+
+
+class DirtyRenderer:
+    """Redraws and pushes only the parts of the screen that changed.
+
+    A frame is a list of layers (name, key, rect, draw) in drawing order;
+    key is whatever decides the layer's look besides its rect. Areas under
+    new, moved, changed or vanished layers are restored from the background
+    and every layer touching them is drawn again, clipped to the area.
+    """
+
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.previous = {}
+        self.full = True
+
+    def invalidate(self):
+        # Repaint everything on the next frame, e.g. after another screen was shown
+        self.full = True
+
+    def render(self, layers):
+        current = {}
+        dirty = []
+        for name, key, rect, draw in layers:
+            current[name] = (key, rect)
+            old = self.previous.get(name)
+            if old != (key, rect):
+                dirty.append(rect)
+                if old is not None:
+                    dirty.append(old[1])
+        for name, (key, rect) in self.previous.items():
+            if name not in current:
+                dirty.append(rect)
+        if self.full:
+            dirty = [self.screen.get_rect()]
+            self.full = False
+        self.previous = current
+
+        for area in dirty:
+            self.screen.set_clip(area)
+            self.screen.blit(self.background, area, area)
+            for name, key, rect, draw in layers:
+                if rect.colliderect(area):
+                    draw()
+        self.screen.set_clip(None)
+        pygame.display.update(dirty)
+        return dirty
+
+
+class SpriteCache:
+    """Rotated copies of sprites, built on first use.
+
+    Angles are rounded to a multiple of step degrees (0 keeps them exact),
+    so a cannon holding its aim reuses one surface instead of rotating the
+    image every frame. Past capacity the least recently used copy is dropped.
+    """
+
+    def __init__(self, step=ROTATION_STEP, capacity=SPRITE_CACHE_SIZE):
+        self.step = step
+        self.capacity = capacity
+        self.sprites = OrderedDict()
+
+    def get(self, key, build):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        sprite = self.sprites[key] = build()
+        if len(self.sprites) > self.capacity:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def rotated(self, image, angle):
+        if self.step:
+            angle = round(angle / self.step) * self.step
+        angle %= 360
+        return self.get((image, "rotate", angle), lambda: pygame.transform.rotate(image, angle))
@@ -0,0 +1,249 @@
+import argparse
+import bisect
+import math
+import mmap
+import struct
+from array import array
+from collections import deque
+
+from bullets import BULLET_TYPES
+from engine import STATE_FIELDS, EngineState, MatchEngine
+from events import EventEngine
+
+# File layout: header, then one fixed-size record per bot decision
+MAGIC = b"AGRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBqI")  # magic, version, seed, decision count
+RECORD = struct.Struct("<IBBdd")  # tick, player, bullet type, angle, power
+
+# Archive layout: header, decision records, keyframe blobs, keyframe index
+ARCHIVE_MAGIC = b"AGRK"
+ARCHIVE_VERSION = 5  # Version 5 stores keyframes as fixed KEYFRAME records
+ARCHIVE_HEADER = struct.Struct("<4sBqIIIQ")  # magic, version, seed, decisions, interval, keyframes, index offset
+INDEX_ENTRY = struct.Struct("<IQI")  # tick, blob offset, blob length
+KEYFRAME_INTERVAL = 300
+
+# Keyframe layout: STATE_FIELDS, with each executing shot as (bullet type or
+# 0, angle, power), the BALL_FIELDS vectors, the number of decisions taken
+# and the bullet count; then one
+# BULLET per bullet in flight and the engine's random stream (Mersenne
+# Twister words and position, whether a gauss value is cached and its value)
+KEYFRAME = struct.Struct("<qqq? 8q 4d ?? qq BddBdd q 8d qq I H")
+BULLET = struct.Struct("<4dq4db")  # origin, velocity, age, position, angle, power, type
+BULLET_TYPECODES = "ddddqddddb"  # BulletPool.columns()
+RNG_STATE = struct.Struct("<625I?d")
+RNG_VERSION = 3
+EXECUTING = STATE_FIELDS.index("player1_executing")
+
+BULLET_TYPE_NAMES = {code: name for name, code in BULLET_TYPES.items()}
+
+
+class Replay:
+    """A match stored as its seed plus the shots the two scripts took.
+
+    Commands the engine rejected (no bullets of that type left) change nothing
+    but the drawn cannon angle, so they are not stored.
+    """
+
+    def __init__(self, seed, decisions):
+        self.seed = seed
+        self.decisions = decisions
+
+    @classmethod
+    def from_engine(cls, engine):
+        return cls(engine.seed, list(engine.decisions))
+
+    def pack_decisions(self):
+        return b"".join(RECORD.pack(tick, player, BULLET_TYPES.get(bullet_type, 0), angle, power)
+                        for tick, player, (angle, power, bullet_type) in self.decisions)
+
+    @staticmethod
+    def unpack_decisions(data):
+        return [(tick, player, (angle, power, BULLET_TYPE_NAMES.get(type_code)))
+                for tick, player, type_code, angle, power in RECORD.iter_unpack(data)]
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, VERSION, self.seed, len(self.decisions)) + self.pack_decisions()
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a replay file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        return cls(seed, cls.unpack_decisions(data[HEADER.size:HEADER.size + count * RECORD.size]))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def engine(self):
+        return ReplayEngine(self)
+
+    def play(self):
+        return self.engine().play()
+
+
+class ReplayEngine(EventEngine):
+    """EventEngine that takes its decisions from a Replay instead of team scripts.
+
+    The recorded ticks say when each player shoots next, so the ticks a
+    player spends ready without shooting are skipped as well.
+    """
+
+    def __init__(self, replay):
+        super().__init__(None, None, replay.seed)
+        self.replay = replay
+        self.pending = deque(replay.decisions)
+
+    def restored(self):
+        super().restored()
+        # Continue from the first decision at or after the restored tick
+        start = bisect.bisect_left(self.replay.decisions, self.ticks, key=lambda decision: decision[0])
+        self.pending = deque(self.replay.decisions[start:])
+        self.decisions = list(self.replay.decisions[:start])
+
+    def fork(self, seed=None):
+        engine = super().fork(seed)
+        engine.pending = deque(self.pending)
+        return engine
+
+    def next_decision(self, player, ready_tick):
+        for tick, decision_player, command in self.pending:
+            if decision_player == player:
+                return max(ready_tick, tick)
+        return math.inf
+
+    def decide(self, player):
+        # Decisions are stored in the order the engine asks for them
+        if self.pending and self.pending[0][0] == self.ticks and self.pending[0][1] == player:
+            return self.pending.popleft()[2]
+        return None
+
+
+class ReplayArchive:
+    """Replay file with engine keyframes every few hundred ticks for fast seeking.
+
+    The file is memory-mapped; seek(tick) restores the closest earlier keyframe
+    and only simulates the ticks after it.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, seed, count, self.interval,
+         keyframes, index_offset) = ARCHIVE_HEADER.unpack_from(self.data, 0)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError("Not a replay archive")
+        if version != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported replay archive version {version}")
+        start = ARCHIVE_HEADER.size
+        self.replay = Replay(seed, Replay.unpack_decisions(self.data[start:start + count * RECORD.size]))
+        self.index = [INDEX_ENTRY.unpack_from(self.data, index_offset + i * INDEX_ENTRY.size)
+                      for i in range(keyframes)]
+        self.keyframe_ticks = [tick for tick, offset, length in self.index]
+
+    @staticmethod
+    def write(path, replay, interval=KEYFRAME_INTERVAL):
+        # Re-simulate the replay once and keep a snapshot every interval ticks
+        engine = replay.engine()
+        blobs = []
+        while True:
+            blobs.append((engine.ticks, pack_keyframe(engine.snapshot())))
+            if engine.game_over:
+                break
+            engine.run_until(engine.ticks + interval)
+
+        decisions = replay.pack_decisions()
+        offset = ARCHIVE_HEADER.size + len(decisions)
+        index = []
+        for tick, blob in blobs:
+            index.append(INDEX_ENTRY.pack(tick, offset, len(blob)))
+            offset += len(blob)
+        with open(path, "wb") as f:
+            f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, replay.seed, len(replay.decisions),
+                                        interval, len(blobs), offset))
+            f.write(decisions)
+            f.writelines(blob for tick, blob in blobs)
+            f.writelines(index)
+
+    def keyframe(self, tick):
+        # Latest keyframe at or before tick
+        tick, offset, length = self.index[max(0, bisect.bisect_right(self.keyframe_ticks, tick) - 1)]
+        return unpack_keyframe(self.data[offset:offset + length], self.replay.seed)
+
+    def seek(self, tick):
+        # Engine positioned just before tick runs (or at the end of the match)
+        engine = self.replay.engine()
+        engine.restore(self.keyframe(tick))
+        engine.run_until(tick)
+        return engine
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pack_keyframe(state):
+    # Fixed-layout bytes of an EngineState; replays need no script streams
+    values = list(state.values)
+    for i in (EXECUTING + 1, EXECUTING):
+        executing = values[i]
+        values[i:i + 1] = (0, 0.0, 0.0) if executing is None else (BULLET_TYPES[executing[2]], *executing[:2])
+    columns = state.bullets
+    count = len(columns[0])
+    version, words, gauss = state.rng
+    if version != RNG_VERSION:
+        raise ValueError(f"Unsupported random state version {version}")
+    return b"".join([KEYFRAME.pack(*values, state.decision_count, count),
+                     *(BULLET.pack(*(column[i] for column in columns)) for i in range(count)),
+                     RNG_STATE.pack(*words, gauss is not None, gauss or 0.0)])
+
+
+def unpack_keyframe(data, seed):
+    # EngineState of a keyframe of the match played with seed
+    values = list(KEYFRAME.unpack_from(data, 0))
+    count = values.pop()
+    decision_count = values.pop()
+    for i in (EXECUTING, EXECUTING + 1):
+        type_code, angle, power = values[i:i + 3]
+        values[i:i + 3] = [(angle, power, BULLET_TYPE_NAMES[type_code]) if type_code else None]
+    bullets = list(BULLET.iter_unpack(data[KEYFRAME.size:KEYFRAME.size + count * BULLET.size]))
+    columns = tuple(array(typecode, [bullet[j] for bullet in bullets]) for j, typecode in enumerate(BULLET_TYPECODES))
+    rng = RNG_STATE.unpack_from(data, KEYFRAME.size + count * BULLET.size)
+    return EngineState(tuple(values), columns, (RNG_VERSION, rng[:625], rng[626] if rng[625] else None),
+                       None, seed, decision_count)
+
+
+def record_match(player_script_left, player_script_right, seed=None):
+    engine = MatchEngine(player_script_left, player_script_right, seed)
+    result = engine.play()
+    return result, Replay.from_engine(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-simulate recorded matches and print their results.")
+    parser.add_argument("replays", nargs="+", help="replay files")
+    args = parser.parse_args()
+
+    for path in args.replays:
+        result = Replay.load(path).play()
+        print(f"{path}: {result['player1_score']}-{result['player2_score']} "
+              f"(bullets {result['bullets_used1']}-{result['bullets_used2']}), "
+              f"winner {result['winner'] or 'tie'}, {result['ticks']} ticks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from engine import RANDOM_FUNCTIONS, call_with_random
+from events import EventEngine
+from game import FootballGame
+from registry import TeamRegistry
+from winprob import estimate
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEAM = '''
+def player_script(cannon_pos, ball_pos, power_bullet_count, precision_bullet_count, ball_vel):
+    return ({angle}, 10, "precision")
+'''
+
+
+DRAWING_TEAM = '''
+import random
+DRAW = random.random()
+
+def player_script(cannon_pos, ball_pos, power_bullet_count, precision_bullet_count, ball_vel):
+    return None
+'''
+
+
+def write_team(teams_dir, angle, mtime_ns):
+    path = teams_dir / "reloaded.py"
+    path.write_text(TEAM.format(angle=angle))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reloaded_script_still_runs_in_worker_processes(tmp_path, monkeypatch):
+    monkeypatch.chdir(REPO)
+    teams_dir = tmp_path / "teams"
+    teams_dir.mkdir()
+    write_team(teams_dir, 10, 1_000_000_000)
+    registry = TeamRegistry(str(teams_dir))
+    script = registry.script("reloaded")
+
+    # Reload; the match keeps playing the version it started with
+    write_team(teams_dir, 20, 2_000_000_000)
+    assert registry.scan() == ["reloaded"]
+    assert registry.script("reloaded")(None, None, 0, 0, None)[0] == 20
+
+    game = FootballGame.__new__(FootballGame)
+    game.init_game(script, script, async_decisions="process")
+    try:
+        assert game.decide(1) is None
+        deadline = time.time() + 30
+        command = None
+        while command is None and time.time() < deadline:
+            time.sleep(0.01)
+            command = game.decide(1)
+        assert command == (10, 10, "precision")
+    finally:
+        game.close_scripts()
+        pygame.quit()
+
+    engine = EventEngine(script, script, 1)
+    engine.run_until(60)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        summary = estimate(engine.snapshot(), script, script, n=16, executor=executor)
+    assert summary["rollouts"] == 16
+
+
+def test_registry_never_loads_teams_during_a_script_call(tmp_path):
+    teams_dir = tmp_path / "teams"
+    teams_dir.mkdir()
+    registry = TeamRegistry(str(teams_dir))
+    (teams_dir / "drawing.py").write_text(DRAWING_TEAM)
+    rng = random.Random("stream")
+    functions = {name: getattr(rng, name) for name in RANDOM_FUNCTIONS}
+
+    def script():
+        # The module draws from the global random, not from this stream
+        scan = threading.Thread(target=registry.scan)
+        scan.start()
+        scan.join(0.2)
+        assert scan.is_alive()
+        return scan
+
+    state = rng.getstate()
+    scan = call_with_random(functions, script)
+    scan.join()
+    assert registry.teams() == ["drawing"]
+    assert rng.getstate() == state
@@ -0,0 +1,51 @@
+import math
+
+from engine import MAX_POWER, MatchEngine
+from trajectory import CANNON_LEFT, CANNON_RIGHT, ball_at, charge_ticks, shot
+
+
+def idle(cannon_pos, ball_pos, power_bullet_count, precision_bullet_count, ball_vel):
+    return None
+
+
+def play_shot(cannon_pos, ball_pos, ball_vel, target):
+    # Where the ball comes to rest after the command of shot(), or None on a goal
+    command = shot(cannon_pos, ball_pos, ball_vel, target)
+    commands = [command]
+
+    def script(*args):
+        return commands.pop() if commands else None
+
+    engine = MatchEngine(*((script, idle) if cannon_pos == CANNON_LEFT else (idle, script)), 0)
+    engine.ball_pos[:] = ball_pos
+    engine.launch_ball(list(ball_vel))
+    while (commands or engine.player1_executing or engine.player2_executing or engine.bullets.count or
+           engine.ball_vel != [0, 0]):
+        engine.step()
+        if engine.player1_score or engine.player2_score:
+            return None
+    return engine.ball_pos
+
+
+def test_shot_stops_the_ball_at_the_target():
+    for cannon_pos, ball_vel, target in ((CANNON_LEFT, [0, 0], (500, 300)),
+                                         (CANNON_LEFT, [0, 0], (420, 300)),
+                                         (CANNON_LEFT, [0, 0], (700, 300)),
+                                         (CANNON_LEFT, [0, 0], (600, 150)),
+                                         (CANNON_LEFT, [0.4, -0.3], (550, 200)),
+                                         (CANNON_RIGHT, [0, 0], (150, 300)),
+                                         (CANNON_RIGHT, [0, 0], (250, 200))):
+        rest = play_shot(cannon_pos, [400, 300], ball_vel, target)
+        assert rest is not None
+        assert math.dist(rest, target) < 25
+
+
+def test_shot_at_the_ball_has_a_usable_power():
+    for cannon_pos in (CANNON_LEFT, CANNON_RIGHT):
+        for ball_vel, speed in (([0, 0], None), ([0.3, -0.2], None), ([0.3, -0.2], 0)):
+            ball_pos = [400, 300]
+            # Target where the ball will be when a bullet can first reach it
+            target, _ = ball_at(ball_pos, ball_vel, charge_ticks(MAX_POWER) + 25)
+            for aim in (ball_pos, target):
+                angle, power, bullet_type = shot(cannon_pos, ball_pos, ball_vel, aim, speed=speed)
+                assert 1 <= power <= MAX_POWER
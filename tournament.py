@@ -0,0 +1,156 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import util
+
+from engine import MatchEngine
+from latency import LatencyRecorder
+from registry import find_teams, load_player_script
+from workers import WorkerPool
+
+# Points awarded per match result
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+
+def load_teams(team_names):
+    # Keep only teams whose module imports and defines player_script
+    teams = []
+    for team_name in dict.fromkeys(team_names):
+        try:
+            load_player_script(team_name)
+        except Exception as e:
+            print(f"Skipping team {team_name}: {e}")
+            continue
+        teams.append(team_name)
+    return teams
+
+
+def schedule(teams, seeds, budget=None, timed=False):
+    # Every pairing, from both sides, once per seed
+    return [(left, right, seed, budget, timed)
+            for left, right in itertools.permutations(teams, 2)
+            for seed in seeds]
+
+
+# Script workers of the current tournament process, used when decisions have a budget
+_worker_pool = None
+
+
+def get_worker_pool(budget):
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = WorkerPool(budget)
+        util.Finalize(_worker_pool, _worker_pool.close, exitpriority=10)
+    return _worker_pool
+
+
+def play_fixture(fixture):
+    left, right, seed, budget, timed = fixture
+    try:
+        if budget is None:
+            scripts = load_player_script(left), load_player_script(right)
+        else:
+            # Give the workers the script streams the engine would, so
+            # fixtures reproduce unless a decision runs late
+            pool = get_worker_pool(budget)
+            scripts = pool.get(left).seeded(f"{seed}:left"), pool.get(right).seeded(f"{seed}:right")
+        engine = MatchEngine(*scripts, seed)
+        engine.team_names = [left, right]
+        if timed:
+            engine.latency = LatencyRecorder()
+        result = engine.play()
+    except Exception as e:
+        return left, right, seed, None, None, f"{type(e).__name__}: {e}"
+    return left, right, seed, result, engine.latency, None
+
+
+class Standings:
+    def __init__(self, teams):
+        self.rows = {team: {"played": 0, "won": 0, "drawn": 0, "lost": 0,
+                            "goals_for": 0, "goals_against": 0, "points": 0}
+                     for team in teams}
+
+    def record(self, left, right, result):
+        goals = {left: result["player1_score"], right: result["player2_score"]}
+        winner = {1: left, 2: right}.get(result["winner"])
+        for team, opponent in ((left, right), (right, left)):
+            row = self.rows[team]
+            row["played"] += 1
+            row["goals_for"] += goals[team]
+            row["goals_against"] += goals[opponent]
+            if winner is None:
+                row["drawn"] += 1
+                row["points"] += DRAW_POINTS
+            elif winner == team:
+                row["won"] += 1
+                row["points"] += WIN_POINTS
+            else:
+                row["lost"] += 1
+
+    def ranked(self):
+        return sorted(self.rows.items(),
+                      key=lambda item: (item[1]["points"],
+                                        item[1]["goals_for"] - item[1]["goals_against"],
+                                        item[1]["goals_for"]),
+                      reverse=True)
+
+    def format_table(self):
+        width = max([len("Team")] + [len(team) for team in self.rows])
+        lines = [f"{'#':>3}  {'Team':<{width}}  {'P':>5} {'W':>5} {'D':>5} {'L':>5} "
+                 f"{'GF':>5} {'GA':>5} {'Pts':>6}"]
+        for rank, (team, row) in enumerate(self.ranked(), start=1):
+            lines.append(f"{rank:>3}  {team:<{width}}  {row['played']:>5} {row['won']:>5} "
+                         f"{row['drawn']:>5} {row['lost']:>5} {row['goals_for']:>5} "
+                         f"{row['goals_against']:>5} {row['points']:>6}")
+        return "\n".join(lines)
+
+
+def run_tournament(teams, seeds, workers=None, budget=None, latency=None):
+    # Decision latencies of every match are merged into latency when given
+    fixtures = schedule(teams, seeds, budget, latency is not None)
+    standings = Standings(teams)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(fixtures) // (workers * 16))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for left, right, seed, result, match_latency, error in executor.map(play_fixture, fixtures,
+                                                                             chunksize=chunksize):
+            if error is not None:
+                print(f"Error in {left} vs {right} (seed {seed}): {error}")
+                continue
+            standings.record(left, right, result)
+            if match_latency is not None:
+                latency.merge(match_latency)
+
+    return standings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a round-robin tournament between team scripts.")
+    parser.add_argument("teams", nargs="*", help="team names to include (default: every module in teams/)")
+    parser.add_argument("--seeds", type=int, default=3, help="matches per pairing and side")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first match in each pairing")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="seconds per decision; runs each team script in its own worker process "
+                             "(seeded matches still reproduce unless a decision runs late)")
+    parser.add_argument("--latency-report", default=None,
+                        help="write per-team decision latencies to this .json or .csv file")
+    args = parser.parse_args()
+
+    teams = load_teams(args.teams or find_teams())
+    if len(teams) < 2:
+        raise SystemExit("A tournament needs at least two playable teams")
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    latency = LatencyRecorder(capacity=65536) if args.latency_report else None
+    standings = run_tournament(teams, seeds, args.workers, args.budget, latency)
+    print(standings.format_table())
+    if latency is not None:
+        latency.write(args.latency_report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import bisect
+import math
+
+from engine import (WIDTH, HEIGHT, BALL_RADIUS, BULLET_RADIUS, FRICTION, MAX_POWER, BULLET_SPEED,
+                    POWER_INCREMENT, FPS, MatchEngine)
+from kinematics import friction_tables, stop_age
+
+# Rules, taken from a reference MatchEngine so both stay in sync
+_rules = MatchEngine(None, None)
+CANNON_LEFT = _rules.cannon1_pos
+CANNON_RIGHT = _rules.cannon2_pos
+POWER_MULTIPLIER = _rules.powerbullet_multiplier
+POWER_ANGLE_ERROR = _rules.powerbullet_angle_error
+TURN_DELAY_TICKS = _rules.turn_delay_ticks
+
+# Distance between bullet and ball centres at which they touch
+REACH = BALL_RADIUS + BULLET_RADIUS
+
+# Ticks a bullet can fly before it must have left the field
+MAX_FLIGHT = math.ceil(math.hypot(WIDTH, HEIGHT) / BULLET_SPEED) + 1
+
+# Velocity factor and distance factor k ticks after a launch, shared with the engine
+POWERS, SUMS = friction_tables(FRICTION)
+
+# Steps and tolerance (radians) of the kick direction search in shot()
+SHOT_ITERATIONS = 10
+SHOT_TOLERANCE = 0.01
+
+# Distance a ball launched at SPEED_STEP * i rolls before it stops, for
+# every speed one hit can give it
+SPEED_STEP = 0.01
+TRAVEL = [i * SPEED_STEP * SUMS[stop_age(i * SPEED_STEP, POWERS)]
+          for i in range(math.ceil(MAX_POWER * POWER_INCREMENT * POWER_MULTIPLIER / SPEED_STEP) + 1)]
+
+# Ball positions and velocities below are those after a number of ball
+# updates from the (ball_pos, ball_vel) a player_script is given. The update
+# of the tick the script is called in is the first. They follow
+# MatchEngine.update_ball(): friction, stopping and wall bounces, but no
+# goals and no bullet hits.
+
+
+def charge_ticks(power):
+    # Ticks a cannon charges for a shot of power before it fires
+    return _rules.charge_ticks(0, power)
+
+
+def _crossing(position, velocity, size, limit):
+    # First age in 1..limit at which an axis launched from position at
+    # velocity touches a side (0 or size) of the field, or None
+    def touching(k):
+        p = position + velocity * SUMS[k]
+        return p - BALL_RADIUS <= 0 or p + BALL_RADIUS >= size
+
+    if limit < 1:
+        return None
+    if touching(1):
+        return 1
+    edge = size - BALL_RADIUS if velocity > 0 else BALL_RADIUS
+    age = bisect.bisect_left(SUMS, (edge - position) / velocity, 1, limit + 1)
+    while age > 1 and touching(age - 1):
+        age -= 1
+    while age <= limit and not touching(age):
+        age += 1
+    return age if age <= limit else None
+
+
+def _segments(ball_pos, ball_vel, ticks):
+    # Stretches of free motion over ticks updates, split at bounces, as
+    # (start, length, x, y, vx, vy, stop_x, stop_y)
+    (x, y), (vx, vy) = ball_pos, ball_vel
+    start = 0
+    while True:
+        stop_x, stop_y = stop_age(vx, POWERS), stop_age(vy, POWERS)
+        length = ticks - start
+        bounce = _crossing(y, vy, HEIGHT, min(length, stop_y - 1)) if vy else None
+        if bounce is not None:
+            length = bounce
+        yield start, length, x, y, vx, vy, stop_x, stop_y
+        if bounce is None:
+            return
+        # The bounce relaunches the ball from where it is with vy reversed
+        if vx:
+            x += vx * SUMS[min(length, stop_x)]
+        y += vy * SUMS[length]
+        vx = vx * POWERS[length] if length < stop_x else 0
+        vy = -(vy * POWERS[length])
+        start += length
+
+
+def ball_at(ball_pos, ball_vel, ticks):
+    # Ball position and velocity after ticks updates
+    for start, length, x, y, vx, vy, stop_x, stop_y in _segments(ball_pos, ball_vel, ticks):
+        pass
+    k = ticks - start
+    return ((x + vx * SUMS[min(k, stop_x)] if vx else x, y + vy * SUMS[min(k, stop_y)] if vy else y),
+            (vx * POWERS[k] if k < stop_x else 0, vy * POWERS[k] if k < stop_y else 0))
+
+
+def ball_path(ball_pos, ball_vel, ticks):
+    # Ball positions after 1 to ticks updates
+    path = []
+    for start, length, x, y, vx, vy, stop_x, stop_y in _segments(ball_pos, ball_vel, ticks):
+        for k in range(1, length + 1):
+            path.append((x + vx * SUMS[min(k, stop_x)] if vx else x, y + vy * SUMS[min(k, stop_y)] if vy else y))
+    return path
+
+
+def goal_tick(ball_pos, ball_vel, limit=_rules.game_time * FPS):
+    # Updates (up to limit) until the ball reaches a goal line, or None
+    for start, length, x, y, vx, vy, stop_x, stop_y in _segments(ball_pos, ball_vel, limit):
+        if vx:
+            goal = _crossing(x, vx, WIDTH, min(length, stop_x))
+            if goal is not None:
+                return start + goal
+    return None
+
+
+def speed_for(distance):
+    # Launch speed at which a resting ball rolls distance before it stops
+    i = bisect.bisect_left(TRAVEL, distance)
+    if i >= len(TRAVEL):
+        return (len(TRAVEL) - 1) * SPEED_STEP
+    if i == 0:
+        return 0.0
+    low, high = TRAVEL[i - 1], TRAVEL[i]
+    return (i - 1 + (distance - low) / (high - low)) * SPEED_STEP
+
+
+def _contact(cannon_pos, angle, path, delay):
+    # First bullet age at which a bullet fired at angle after delay ball
+    # updates touches the ball on path, with the bullet's position; None
+    # if it leaves the field first
+    cannon_x, cannon_y = cannon_pos
+    vx = math.cos(math.radians(angle)) * BULLET_SPEED
+    vy = -math.sin(math.radians(angle)) * BULLET_SPEED
+    reach_squared = REACH * REACH
+    for k in range(1, min(MAX_FLIGHT, len(path) - delay) + 1):
+        x = cannon_x + k * vx
+        y = cannon_y + k * vy
+        if x < 0 or x > WIDTH or y < 0 or y > HEIGHT:
+            return None
+        ball_x, ball_y = path[delay + k - 1]
+        if (ball_x - x) ** 2 + (ball_y - y) ** 2 <= reach_squared:
+            return k, x, y
+    return None
+
+
+def intercept(cannon_pos, ball_pos, ball_vel, power=MAX_POWER, offset=0.0):
+    """Aim for a shot of power decided now that meets the ball in flight.
+
+    The bullet is aimed at where the ball will be when it can first get
+    there, shifted sideways by offset (positive is to the left of the line
+    of fire, as seen from the cannon) to hit the ball off centre. Returns
+    (angle, ticks, push): the cannon angle, the ball updates until the
+    bullet touches the ball, see ball_at(), and the unit vector of the
+    kick it gives. None if the bullet leaves the field first.
+    """
+    delay = charge_ticks(power) + 1
+    return _intercept(cannon_pos, ball_path(ball_pos, ball_vel, delay + MAX_FLIGHT), delay, offset)
+
+
+def _intercept(cannon_pos, path, delay, offset):
+    cannon_x, cannon_y = cannon_pos
+    for m in range(1, MAX_FLIGHT + 1):
+        ball_x, ball_y = path[delay + m - 1]
+        distance = math.hypot(ball_x - cannon_x, ball_y - cannon_y)
+        if distance <= BULLET_SPEED * m:
+            break
+    else:
+        return None
+
+    if distance:
+        # Left of the line of fire is (dy, -dx) on screen, where y points down
+        ball_x, ball_y = (ball_x + (ball_y - cannon_y) / distance * offset,
+                          ball_y - (ball_x - cannon_x) / distance * offset)
+    angle = math.degrees(math.atan2(cannon_y - ball_y, ball_x - cannon_x))
+    contact = _contact(cannon_pos, angle, path, delay)
+    if contact is None:
+        return None
+    k, x, y = contact
+    ball_x, ball_y = path[delay + k - 1]
+    gap = math.hypot(ball_x - x, ball_y - y) or 1.0
+    return angle, delay + k, ((ball_x - x) / gap, (ball_y - y) / gap)
+
+
+def shot(cannon_pos, ball_pos, ball_vel, target, bullet_type="precision", speed=None):
+    """(angle, power, bullet_type) that kicks the ball towards target.
+
+    Ready to be returned from a player_script. The kick leaves the ball
+    rolling towards target at speed, by default the speed at which it
+    stops there; power is capped at MAX_POWER. A bullet can only kick the
+    ball away from the cannon, so the closest kick is chosen when target
+    lies behind the ball. Power bullets of the left cannon get a random
+    angle error of up to POWER_ANGLE_ERROR degrees. Returns None if no
+    bullet can reach the ball.
+    """
+    multiplier = POWER_MULTIPLIER if bullet_type == "power" else 1
+    path = ball_path(ball_pos, ball_vel, charge_ticks(MAX_POWER) + 1 + MAX_FLIGHT)
+
+    # Bisect on the sideways offset: hitting further left of centre turns
+    # the kick clockwise on screen. Each step aims with the power the
+    # previous kick asked for, since the charge time moves the contact.
+    low, high = -0.9 * REACH, 0.9 * REACH
+    offset = 0.0
+    power = MAX_POWER
+    best = None
+    for _ in range(SHOT_ITERATIONS):
+        hit = _intercept(cannon_pos, path, charge_ticks(power) + 1, offset)
+        if hit is None:
+            if best is None and not offset:
+                return None
+            # Too far off centre to touch the ball
+            if offset > 0:
+                high = offset
+            else:
+                low = offset
+            offset = (low + high) / 2
+            continue
+        angle, ticks, (push_x, push_y) = hit
+        (ball_x, ball_y), (vx, vy) = ball_at(ball_pos, ball_vel, ticks)
+
+        # Kick that turns the ball's velocity into the wanted one, and the
+        # (whole, as the cannon charges) power closest to giving it
+        dx, dy = target[0] - ball_x, target[1] - ball_y
+        distance = math.hypot(dx, dy) or 1.0
+        wanted = speed_for(distance) if speed is None else speed
+        kick_x, kick_y = dx / distance * wanted - vx, dy / distance * wanted - vy
+        turn = math.atan2(kick_y * push_x - kick_x * push_y, kick_x * push_x + kick_y * push_y)
+        power = max(1, min(MAX_POWER, round(math.hypot(kick_x, kick_y) / (POWER_INCREMENT * multiplier))))
+        if best is None or abs(turn) < best[0]:
+            best = (abs(turn), offset, power, angle)
+        if abs(turn) < SHOT_TOLERANCE:
+            break
+        if turn > 0:
+            low = offset
+        else:
+            high = offset
+        offset = (low + high) / 2
+
+    # Aim again with the chosen power, so angle and power go together
+    turn, offset, power, angle = best
+    hit = _intercept(cannon_pos, path, charge_ticks(power) + 1, offset)
+    return (angle if hit is None else hit[0]), power, bullet_type
@@ -0,0 +1,228 @@
+import argparse
+
+import pygame
+
+from assets import Assets
+from bullets import POWER
+from engine import WIDTH, HEIGHT, BALL_RADIUS, BULLET_RADIUS, MAX_POWER, FPS
+from events import EventEngine
+from registry import find_teams, load_player_script
+from render import RenderCache, SpriteCache, paint_field
+from tournament import load_teams, schedule
+
+# Window size and tiles per row and column
+WALL_WIDTH = 1200
+WALL_HEIGHT = 900
+GRID = 6
+
+# Frames a finished match stays on its tile before the next fixture takes it
+RESULT_FRAMES = 2 * FPS
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+GREEN = (0, 255, 0)
+GRAY = (200, 200, 200)
+
+
+class Tile:
+    def __init__(self, index, surface):
+        self.index = index
+        self.surface = surface  # Subsurface of the screen
+        self.rect = pygame.Rect(surface.get_abs_offset(), surface.get_size())
+        self.engine = None
+        self.key = None  # What the tile showed when last drawn
+        self.finished_frames = 0
+
+
+class SpectatorWall:
+    """Many headless matches played at once, each drawn scaled down into a tile of one window.
+
+    Every tile is a subsurface of the screen. The field is painted once at
+    tile size and the cannon sprites are scaled and rotated once, then
+    shared by all tiles. A tile is only redrawn and pushed to the display
+    when something it shows changes, so a match with the ball at rest and
+    no bullets in the air costs only its engine tick. Fixtures beyond the
+    number of tiles wait for a match to finish.
+    """
+
+    def __init__(self, fixtures, grid=GRID, size=(WALL_WIDTH, WALL_HEIGHT), speed=1):
+        pygame.init()
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption("Spectator Wall")
+        self.clock = pygame.time.Clock()
+        self.FPS = FPS
+        self.speed = speed
+        self.MAX_SPEED = 64
+
+        # Fixtures still to play, as (left, right, seed)
+        self.fixtures = [fixture[:3] for fixture in fixtures]
+        self.scripts = {}
+        self.results = []
+
+        # Tiles, filled row by row
+        tile_width, tile_height = size[0] // grid, size[1] // grid
+        self.scale = min(tile_width / WIDTH, tile_height / HEIGHT)
+        self.tiles = [Tile(i, self.screen.subsurface((i % grid) * tile_width, (i // grid) * tile_height,
+                                                     tile_width, tile_height))
+                      for i in range(min(grid * grid, len(self.fixtures)))]
+
+        # Assets shared by every tile
+        self.assets = Assets()
+        self.render_cache = RenderCache()
+        self.sprites = SpriteCache()
+        cannon_size = (max(1, round(60 * self.scale)), max(1, round(20 * self.scale)))
+        self.assets.preload([("cannon.png", cannon_size), ("cannon.png", cannon_size, (False, True))])
+        self.cannon1_img = self.assets.image("cannon.png", cannon_size)
+        self.cannon2_img = self.assets.image("cannon.png", cannon_size, (False, True))
+        self.field = self.render_cache.background("field", (round(WIDTH * self.scale), round(HEIGHT * self.scale)),
+                                                  self.paint_field)
+        self.font = self.assets.font(max(12, tile_height // 8))
+
+        for tile in self.tiles:
+            self.start_match(tile)
+
+    def paint_field(self, surface):
+        # Paint the field at full size and scale it down smoothly, once
+        field = pygame.Surface((WIDTH, HEIGHT))
+        paint_field(field, WIDTH, HEIGHT)
+        surface.blit(pygame.transform.smoothscale(field, surface.get_size()), (0, 0))
+
+    def load_script(self, team_name):
+        script = self.scripts.get(team_name)
+        if script is None:
+            script = self.scripts[team_name] = load_player_script(team_name)
+        return script
+
+    def start_match(self, tile):
+        left, right, seed = self.fixtures.pop(0)
+        engine = EventEngine(self.load_script(left), self.load_script(right), seed)
+        engine.team_names = [left, right]
+        tile.engine = engine
+        tile.key = None
+        tile.finished_frames = 0
+
+    def tile_key(self, engine):
+        # Everything a tile shows, at tile resolution
+        scale = self.scale
+        pool = engine.bullets
+        bullets = tuple((int(pool.x[i] * scale), int(pool.y[i] * scale), pool.kind[i]) for i in range(pool.count))
+        return (int(engine.ball_pos[0] * scale), int(engine.ball_pos[1] * scale), bullets,
+                engine.angle1, engine.angle2, int(engine.cannon1_power), int(engine.cannon2_power),
+                engine.player1_score, engine.player2_score, engine.counter, engine.game_over)
+
+    def draw_tile(self, tile):
+        engine = tile.engine
+        surface = tile.surface
+        scale = self.scale
+        surface.fill(BLACK)
+        surface.blit(self.field, (0, 0))
+
+        # Cannons and power bars
+        for x, img, angle, power, color in ((50, self.cannon1_img, engine.angle1, engine.cannon1_power, RED),
+                                            (WIDTH - 50, self.cannon2_img, engine.angle2, engine.cannon2_power,
+                                             BLUE)):
+            sprite = self.sprites.rotated(img, angle)
+            surface.blit(sprite, sprite.get_rect(center=(x * scale, HEIGHT // 2 * scale)))
+            bar = pygame.Rect((x - 25) * scale, (HEIGHT // 2 + 40) * scale, 50 * scale, max(1, 10 * scale))
+            pygame.draw.rect(surface, GRAY, bar)
+            bar.width = int(bar.width * power / MAX_POWER)
+            pygame.draw.rect(surface, color, bar)
+
+        # Ball and bullets
+        pygame.draw.circle(surface, GREEN, (engine.ball_pos[0] * scale, engine.ball_pos[1] * scale),
+                           max(1, BALL_RADIUS * scale))
+        pool = engine.bullets
+        for i in range(pool.count):
+            color = RED if pool.kind[i] == POWER else BLACK
+            pygame.draw.circle(surface, color, (pool.x[i] * scale, pool.y[i] * scale), max(1, BULLET_RADIUS * scale))
+
+        # Teams, score and clock, or the result once the match is over
+        left, right = engine.team_names
+        clock = "FT" if engine.game_over else f"{engine.counter}s"
+        text = self.render_cache.text(("score", tile.index), self.font,
+                                      f"{left} {engine.player1_score}-{engine.player2_score} {right}", WHITE)
+        surface.blit(text, (4, 2))
+        text = self.render_cache.text(("clock", tile.index), self.font, clock, WHITE)
+        surface.blit(text, (4, surface.get_height() - text.get_height() - 2))
+
+    def update(self):
+        # Advance every match by speed ticks and redraw the tiles that changed
+        dirty = []
+        for tile in self.tiles:
+            engine = tile.engine
+            if engine is None:
+                continue
+            if not engine.game_over:
+                engine.run_until(engine.ticks + self.speed)
+                if engine.game_over:
+                    self.record(engine)
+            else:
+                tile.finished_frames += 1
+                if tile.finished_frames >= RESULT_FRAMES and self.fixtures:
+                    self.start_match(tile)
+
+            key = self.tile_key(tile.engine)
+            if key != tile.key:
+                tile.key = key
+                self.draw_tile(tile)
+                dirty.append(tile.rect)
+        if dirty:
+            pygame.display.update(dirty)
+        return dirty
+
+    def record(self, engine):
+        result = engine.result()
+        left, right = engine.team_names
+        self.results.append((left, right, result))
+        print(f"{left} {result['player1_score']}-{result['player2_score']} {right} (seed {result['seed']})")
+
+    def handle_events(self):
+        running = True
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                # Fast-forward every match: ] doubles the speed, [ halves it
+                if event.key == pygame.K_RIGHTBRACKET:
+                    self.speed = min(self.speed * 2, self.MAX_SPEED)
+                elif event.key == pygame.K_LEFTBRACKET:
+                    self.speed = max(self.speed // 2, 1)
+                elif event.key == pygame.K_ESCAPE:
+                    running = False
+        return running
+
+    def run(self):
+        self.screen.fill(BLACK)
+        pygame.display.flip()
+        while self.handle_events():
+            self.update()
+            self.clock.tick(self.FPS)
+        pygame.quit()
+        return self.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch many matches at once, tiled in one window.")
+    parser.add_argument("teams", nargs="*", help="team names to include (default: every module in teams/)")
+    parser.add_argument("--seeds", type=int, default=1, help="matches per pairing and side")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first match in each pairing")
+    parser.add_argument("--grid", type=int, default=GRID, help="tiles per row and column")
+    parser.add_argument("--width", type=int, default=WALL_WIDTH, help="window width")
+    parser.add_argument("--height", type=int, default=WALL_HEIGHT, help="window height")
+    parser.add_argument("--speed", type=int, default=1, help="engine ticks per displayed frame")
+    args = parser.parse_args()
+
+    teams = load_teams(args.teams or find_teams())
+    if len(teams) < 2:
+        raise SystemExit("The wall needs at least two playable teams")
+
+    fixtures = schedule(teams, range(args.first_seed, args.first_seed + args.seeds))
+    wall = SpectatorWall(fixtures, args.grid, (args.width, args.height), args.speed)
+    wall.run()
+
+
+if __name__ == "__main__":
+    main()
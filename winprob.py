@@ -0,0 +1,133 @@
+import argparse
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from events import EventEngine
+from registry import load_player_script
+
+# z value of the confidence intervals (95%)
+Z = 1.96
+
+# Stop once the win, draw and loss intervals are all at most this wide
+INTERVAL_WIDTH = 0.1
+
+# Rollouts per task handed to a worker, and between checks of the stopping rule
+CHUNK = 16
+
+
+def wilson(successes, n, z=Z):
+    # Wilson score interval of a proportion, sound for small n and p near 0 or 1
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def rollouts(state, bot_left, bot_right, seeds):
+    # Winner (1, 2 or 0 for a tie) of one rollout per seed; bots may be given
+    # by team name, for workers that cannot be handed the script itself
+    if isinstance(bot_left, str):
+        bot_left = load_player_script(bot_left)
+    if isinstance(bot_right, str):
+        bot_right = load_player_script(bot_right)
+    # Each rollout is a fork with the random streams of its seed, so rollouts
+    # differ from each other but each one is reproducible
+    base = EventEngine(bot_left, bot_right)
+    base.restore(state)
+    return [base.fork(seed).play()["winner"] for seed in seeds]
+
+
+def summarize(counts, z=Z):
+    n = sum(counts.values())
+    summary = {"rollouts": n}
+    for name, winner in (("win", 1), ("draw", 0), ("loss", 2)):
+        summary[name] = counts[winner] / n if n else 0.0
+        summary[f"{name}_interval"] = wilson(counts[winner], n, z)
+    return summary
+
+
+def narrow(summary, width):
+    return all(high - low <= width for low, high in
+               (summary["win_interval"], summary["draw_interval"], summary["loss_interval"]))
+
+
+def estimate(state, bot_left, bot_right, n=1000, seed=0, width=INTERVAL_WIDTH, executor=None,
+             time_limit=None, z=Z):
+    """Win, draw and loss probabilities of the left player from a match state.
+
+    state is a MatchEngine.snapshot(); up to n rollouts are played from it
+    to the end of the match with seeds seed, seed + 1, ... Rollouts run in
+    chunks, spread over executor when one is given, and stop early once
+    every interval is at most width wide or time_limit seconds have passed.
+    Returns the probabilities with their Wilson intervals and the number of
+    rollouts played.
+    """
+    start = time.perf_counter()
+    counts = {0: 0, 1: 0, 2: 0}
+    chunks = [range(first, min(first + CHUNK, seed + n)) for first in range(seed, seed + n, CHUNK)]
+
+    def done():
+        if time_limit is not None and time.perf_counter() - start >= time_limit:
+            return True
+        return narrow(summarize(counts, z), width)
+
+    if executor is None:
+        for seeds in chunks:
+            for winner in rollouts(state, bot_left, bot_right, seeds):
+                counts[winner] += 1
+            if done():
+                break
+        return summarize(counts, z)
+
+    # Keep every worker busy with a couple of chunks and stop handing out
+    # more as soon as the estimate is good enough
+    chunks.reverse()
+    in_flight = set()
+    in_parallel = 2 * (os.cpu_count() or 1)
+    while chunks or in_flight:
+        while chunks and len(in_flight) < in_parallel:
+            in_flight.add(executor.submit(rollouts, state, bot_left, bot_right, chunks.pop()))
+        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in finished:
+            for winner in future.result():
+                counts[winner] += 1
+        if done():
+            for future in in_flight:
+                future.cancel()
+            break
+    return summarize(counts, z)
+
+
+def format_estimate(summary):
+    return "  ".join(f"{name} {summary[name]:.3f} [{summary[f'{name}_interval'][0]:.3f}, "
+                     f"{summary[f'{name}_interval'][1]:.3f}]"
+                     for name in ("win", "draw", "loss")) + f"  ({summary['rollouts']} rollouts)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate the win probability of a match by Monte Carlo rollouts.")
+    parser.add_argument("left", help="left team")
+    parser.add_argument("right", help="right team")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the match to evaluate")
+    parser.add_argument("--at", type=int, default=0, help="tick of that match to start the rollouts from")
+    parser.add_argument("--rollouts", type=int, default=1000, help="most rollouts to play")
+    parser.add_argument("--width", type=float, default=INTERVAL_WIDTH,
+                        help="stop once every confidence interval is at most this wide")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    engine = EventEngine(load_player_script(args.left), load_player_script(args.right), args.seed)
+    engine.run_until(args.at)
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count() or 1) as executor:
+        summary = estimate(engine.snapshot(), args.left, args.right, args.rollouts, width=args.width,
+                           executor=executor)
+    print(f"Tick {engine.ticks}, score {engine.player1_score}-{engine.player2_score}: {format_estimate(summary)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import functools
+import multiprocessing
+import random
+import struct
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+from engine import RANDOM_FUNCTIONS, call_with_random
+from registry import load_player_script
+
+# Shared state block: request number, cannon x/y, ball x/y, ball velocity x/y,
+# power and precision bullets left
+STATE = struct.Struct("<Q6d2q")
+
+# Default time budget per decision, in seconds
+DECISION_BUDGET = 0.005
+
+# How long a new worker may take to import its team script
+STARTUP_TIMEOUT = 30
+
+
+def _start_stream(streams, stream):
+    # random module functions of a new stream seeded with the string stream;
+    # a match uses at most two, so older ones belong to earlier matches
+    if len(streams) >= 2:
+        streams.clear()
+    rng = random.Random(stream)
+    functions = streams[stream] = {name: getattr(rng, name) for name in RANDOM_FUNCTIONS}
+    return functions
+
+
+def _worker_main(team_name, shm_name, conn):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        try:
+            script = load_player_script(team_name)
+        except Exception as e:
+            conn.send(f"{type(e).__name__}: {e}")
+            return
+        conn.send(None)  # Ready
+        streams = {}
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            if isinstance(request, str):
+                _start_stream(streams, request)
+                continue
+            seq, stream = request
+            (_, cannon_x, cannon_y, ball_x, ball_y, vel_x, vel_y,
+             power_count, precision_count) = STATE.unpack_from(shm.buf, 0)
+            args = ((cannon_x, cannon_y), [ball_x, ball_y], power_count, precision_count, [vel_x, vel_y])
+            try:
+                if stream is None:
+                    command = script(*args)
+                else:
+                    functions = streams.get(stream) or _start_stream(streams, stream)
+                    command = call_with_random(functions, script, *args)
+            except Exception as e:
+                print(f"Error in team script {team_name}: {e}")
+                command = None
+            conn.send((seq, command))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class ScriptWorker:
+    """A team's player_script running in its own persistent process.
+
+    Calling the worker has the same signature as player_script. The game state
+    is written to shared memory and the worker gets `budget` seconds to answer;
+    a late answer counts as no shot (None) and is thrown away when it arrives.
+    While the script is still busy with an earlier state, calls return None
+    straight away, so a slow or looping script only ever costs its own turns.
+
+    Scripts draw from the worker's own random module unless called through
+    seeded(), which gives them the stream a MatchEngine would. Matches are
+    then reproducible as long as no decision runs late.
+    """
+
+    def __init__(self, team_name, budget=DECISION_BUDGET):
+        self.team_name = team_name
+        self.budget = budget
+        self.seq = 0
+        self.busy = False
+        self.calls = 0
+        self.late_calls = 0
+
+        context = multiprocessing.get_context("spawn")
+        self.shm = shared_memory.SharedMemory(create=True, size=STATE.size)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(team_name, self.shm.name, child_conn),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+
+        # Wait until the script is imported so the first decisions are not lost to startup
+        error = self.conn.recv() if self.conn.poll(STARTUP_TIMEOUT) else "timed out while starting"
+        if error is not None:
+            self.close()
+            raise RuntimeError(f"Could not start worker for team {team_name}: {error}")
+
+    def __call__(self, cannon_pos, ball_pos, power_bullet_count, precision_bullet_count, ball_vel, stream=None):
+        self.calls += 1
+        try:
+            # Drop answers that came in after their budget ran out
+            while self.conn.poll():
+                seq, command = self.conn.recv()
+                if seq == self.seq:
+                    self.busy = False
+            if self.busy:
+                self.late_calls += 1
+                return None
+
+            self.seq += 1
+            STATE.pack_into(self.shm.buf, 0, self.seq, *cannon_pos, *ball_pos, *ball_vel,
+                            power_bullet_count, precision_bullet_count)
+            self.conn.send((self.seq, stream))
+            self.busy = True
+            if self.conn.poll(self.budget):
+                seq, command = self.conn.recv()
+                self.busy = False
+                return command
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            # The worker died; the team simply stops shooting
+            pass
+        self.late_calls += 1
+        return None
+
+    def seeded(self, stream):
+        # player_script calling the worker with a fresh random stream seeded
+        # by the string stream, e.g. f"{seed}:left" as MatchEngine seeds its
+        # own; call once per match
+        try:
+            self.conn.send(stream)
+        except (BrokenPipeError, OSError):
+            pass  # The worker died; calls will return None
+        return functools.partial(self, stream=stream)
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class WorkerPool:
+    """Keeps the most recently used ScriptWorkers alive between matches."""
+
+    def __init__(self, budget=DECISION_BUDGET, max_workers=4):
+        self.budget = budget
+        self.max_workers = max_workers
+        self.workers = OrderedDict()
+
+    def get(self, team_name):
+        if team_name in self.workers:
+            self.workers.move_to_end(team_name)
+            return self.workers[team_name]
+        while len(self.workers) >= self.max_workers:
+            self.workers.popitem(last=False)[1].close()
+        worker = self.workers[team_name] = ScriptWorker(team_name, self.budget)
+        return worker
+
+    def close(self):
+        while self.workers:
+            self.workers.popitem()[1].close()